@@ -1,17 +1,21 @@
-from flask import Flask, render_template, request, jsonify, send_file, session
+from flask import Flask, render_template, request, jsonify, send_file, session, Response
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 from pathlib import Path
 import json
+import gzip
 import tempfile
 import os
+import itertools
 from datetime import datetime
 
 from config import Config
-from upload_handler import FileUploadHandler
+from upload_handler import FileUploadHandler, ParsedUploadCache, save_stream
 from data_processor import DataProcessor
 from kql_engine import KQLEngine
 from visualization import DataVisualizer
+from session_store import SessionStore, ResultCache
 
 # Flask app
 app = Flask(__name__)
@@ -20,13 +24,124 @@ app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-123')
 
 Config.ensure_directories()
 
-data_store = {}
+# Let engines share frames without defensive copies (always on from pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+_frame_versions = itertools.count()
+
+def _build_session(df):
+    """Create the per-session engines for a frame"""
+    data_info = {}
+    _set_dataframe(data_info, df)
+    return data_info
+
+def _set_dataframe(data_info, df, session_id=None):
+    """Swap the session's frame, reusing its engines and caching the frame layout"""
+    data_info['dataframe'] = df
+    if session_id is not None:
+        # Results for the replaced frame can never be served again, so free their budget now
+        kql_results.invalidate(session_id)
+    # Globally unique so results cached for an earlier frame can never match
+    data_info['version'] = next(_frame_versions)
+    
+    if 'processor' in data_info:
+        for engine in (data_info['processor'], data_info['visualizer'], data_info['kql_engine']):
+            engine.set_dataframe(df)
+    else:
+        data_info['processor'] = DataProcessor(df)
+        data_info['visualizer'] = DataVisualizer(df)
+        data_info['kql_engine'] = KQLEngine(df)
+    
+    # Layout is fixed until the next swap, so paginated reads don't recompute it
+    data_info['shape'] = {'rows': len(df), 'columns': len(df.columns)}
+    data_info['columns_list'] = list(df.columns)
+    data_info['dtypes_map'] = {col: str(dtype) for col, dtype in df.dtypes.items()}
+
+data_store = SessionStore(loader=_build_session)
+kql_results = ResultCache()
+parsed_uploads = ParsedUploadCache(Config.PARSED_CACHE_FOLDER, Config.PARSED_CACHE_MAX_ENTRIES)
 file_metadata = {}
 
+@app.after_request
+def compress_response(response):
+    """Gzip large JSON/Arrow bodies for clients that accept it"""
+    if ('gzip' not in request.headers.get('Accept-Encoding', '').lower()
+            or response.direct_passthrough
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in Config.COMPRESS_MIMETYPES):
+        return response
+    
+    data = response.get_data()
+    if len(data) < Config.COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=Config.COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def _to_records(df):
+    """JSON-ready rows with missing values blanked (safe for categorical columns)"""
+    return df.astype(object).where(df.notna(), '').to_dict('records')
+
+def _wants_arrow():
+    return request.args.get('format') == 'arrow'
+
+def _arrow_bytes(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def arrow_response(df, headers=None):
+    """Serialize a frame as an Arrow IPC stream instead of JSON records"""
+    return Response(_arrow_bytes(df),
+                    mimetype='application/vnd.apache.arrow.stream',
+                    headers=headers)
+
+def _allowed_extension(filename):
+    return Path(filename).suffix.lower().lstrip('.') in Config.ALLOWED_EXTENSIONS
+
+def _register_upload(file_path, timestamp, digest):
+    """Parse a saved upload, store it under a new session and build the response"""
+    cached = parsed_uploads.get(digest)
+    if cached is not None:
+        # Same content was uploaded before: reuse its parsed frame, keeping this session's own source file
+        df, metadata = cached
+        metadata.update({'file_name': file_path.name, 'file_path': str(file_path)})
+    else:
+        upload_handler = FileUploadHandler()
+        df, metadata = upload_handler.process_file(file_path)
+        parsed_uploads.put(digest, df, metadata)
+    
+    # Generate session ID
+    session_id = f"session_{timestamp}"
+    
+    data_info = _build_session(df)
+    data_info['file_path'] = str(file_path)
+    data_info['metadata'] = metadata
+    data_store[session_id] = data_info
+    
+    session['session_id'] = session_id
+    
+    return {
+        'session_id': session_id,
+        'message': 'File uploaded successfully',
+        'metadata': metadata,
+        'preview': {
+            'columns': list(df.columns),
+            'first_rows': _to_records(df.head(10)),
+            'shape': {'rows': len(df), 'columns': len(df.columns)}
+        }
+    }
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     try:
@@ -39,45 +154,40 @@ def upload_file():
             return jsonify({'error': 'No file selected'}), 400
         
         # Check file extension
-        file_ext = Path(file.filename).suffix.lower()
-        if file_ext not in Config.ALLOWED_EXTENSIONS:
-            return jsonify({'error': f'File type not supported: {file_ext}'}), 400
+        if not _allowed_extension(file.filename):
+            return jsonify({'error': f'File type not supported: {Path(file.filename).suffix.lower()}'}), 400
         
         # Save uploaded file
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safe_filename = f"{timestamp}_{file.filename}"
         file_path = Config.UPLOAD_FOLDER / safe_filename
-        file.save(file_path)
-        
-        upload_handler = FileUploadHandler()
-        df, metadata = upload_handler.process_file(file_path)
+        digest = save_stream(file.stream, file_path, Config.UPLOAD_CHUNK_SIZE)
         
-        # Generate session ID
-        session_id = f"session_{timestamp}"
+        return jsonify(_register_upload(file_path, timestamp, digest))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/upload/stream', methods=['POST'])
+def upload_file_stream():
+    """Upload a file sent as the raw request body, bypassing multipart parsing"""
+    try:
+        filename = request.args.get('filename') or request.headers.get('X-Filename', '')
         
-        data_store[session_id] = {
-            'dataframe': df,
-            'processor': DataProcessor(df),
-            'visualizer': DataVisualizer(df),
-            'kql_engine': KQLEngine(df),
-            'file_path': str(file_path),
-            'metadata': metadata
-        }
+        if not filename:
+            return jsonify({'error': 'No file name provided'}), 400
         
-        session['session_id'] = session_id
+        # Check file extension
+        if not _allowed_extension(filename):
+            return jsonify({'error': f'File type not supported: {Path(filename).suffix.lower()}'}), 400
         
-        response_data = {
-            'session_id': session_id,
-            'message': 'File uploaded successfully',
-            'metadata': metadata,
-            'preview': {
-                'columns': list(df.columns),
-                'first_rows': df.head(10).fillna('').to_dict('records'),
-                'shape': {'rows': len(df), 'columns': len(df.columns)}
-            }
-        }
+        # Write the body straight to disk in fixed-size chunks
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        safe_filename = f"{timestamp}_{Path(filename).name}"
+        file_path = Config.UPLOAD_FOLDER / safe_filename
+        digest = save_stream(request.stream, file_path, Config.UPLOAD_CHUNK_SIZE)
         
-        return jsonify(response_data)
+        return jsonify(_register_upload(file_path, timestamp, digest))
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -86,10 +196,10 @@ def upload_file():
 def preview_data():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         df = data_info['dataframe']
         
         rows = min(int(request.args.get('rows', 10)), 100)
@@ -99,14 +209,23 @@ def preview_data():
         
         preview_df = df.iloc[start_idx:end_idx]
         
+        shape = data_info['shape']
+        
+        if _wants_arrow():
+            return arrow_response(preview_df, headers={
+                'X-Total-Rows': str(shape['rows']),
+                'X-Page': str(page),
+                'X-Rows-Per-Page': str(rows)
+            })
+        
         response_data = {
-            'data': preview_df.fillna('').to_dict('records'),
-            'total_rows': len(df),
-            'total_columns': len(df.columns),
+            'data': _to_records(preview_df),
+            'total_rows': shape['rows'],
+            'total_columns': shape['columns'],
             'page': page,
             'rows_per_page': rows,
-            'columns': list(df.columns),
-            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()}
+            'columns': data_info['columns_list'],
+            'dtypes': data_info['dtypes_map']
         }
         
         return jsonify(response_data)
@@ -118,10 +237,10 @@ def preview_data():
 def get_statistics():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         processor = data_info['processor']
         
         stats = processor.calculate_statistics()
@@ -135,20 +254,17 @@ def get_statistics():
 def clean_data():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         processor = data_info['processor']
         
         methods = request.json.get('methods', {})
         
         cleaned_df = processor.clean_data(methods)
         
-        data_info['dataframe'] = cleaned_df
-        data_info['processor'] = DataProcessor(cleaned_df)
-        data_info['visualizer'] = DataVisualizer(cleaned_df)
-        data_info['kql_engine'] = KQLEngine(cleaned_df)
+        _set_dataframe(data_info, cleaned_df, session_id)
         
         response_data = {
             'message': 'Data cleaned successfully',
@@ -165,10 +281,10 @@ def clean_data():
 def execute_kql_query():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         kql_engine = data_info['kql_engine']
         
         # Get query from request
@@ -177,12 +293,20 @@ def execute_kql_query():
         if not query:
             return jsonify({'error': 'No query provided'}), 400
         
-        # Execute query
-        result_df = kql_engine.execute_query(query)
+        # Repeat queries against an unchanged frame are served from the cache
+        cache_key = (session_id, data_info['version'], query.strip())
+        result_df = kql_results.get(cache_key)
+        if result_df is None:
+            # Frames are cached as-is, so a hit has exactly the dtypes of a fresh run
+            result_df = kql_engine.execute_query(query)
+            kql_results.put(cache_key, result_df, int(result_df.memory_usage(deep=True).sum()))
+        
+        if _wants_arrow():
+            return arrow_response(result_df)
         
         # Convert result to JSON
         result_data = {
-            'data': result_df.fillna('').to_dict('records'),
+            'data': _to_records(result_df),
             'columns': list(result_df.columns),
             'row_count': len(result_df),
             'query': query
@@ -197,10 +321,10 @@ def execute_kql_query():
 def get_kql_examples():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         kql_engine = data_info['kql_engine']
         
         examples = kql_engine.get_query_examples()
@@ -214,37 +338,38 @@ def get_kql_examples():
 def create_visualization():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         visualizer = data_info['visualizer']
         
         viz_type = request.json.get('type')
         params = request.json.get('params', {})
+        params.pop('output', None)
         
         if viz_type == 'histogram':
-            result = visualizer.create_histogram(**params)
+            result = visualizer.create_histogram(**params, output='bytes')
         elif viz_type == 'scatter':
-            result = visualizer.create_scatter_plot(**params)
+            result = visualizer.create_scatter_plot(**params, output='bytes')
         elif viz_type == 'line':
-            result = visualizer.create_line_plot(**params)
+            result = visualizer.create_line_plot(**params, output='bytes')
         elif viz_type == 'bar':
-            result = visualizer.create_bar_chart(**params)
+            result = visualizer.create_bar_chart(**params, output='bytes')
         elif viz_type == 'box':
-            result = visualizer.create_box_plot(**params)
+            result = visualizer.create_box_plot(**params, output='bytes')
         elif viz_type == 'heatmap':
-            result = visualizer.create_heatmap(**params)
+            result = visualizer.create_heatmap(**params, output='bytes')
         elif viz_type == 'correlation':
-            result = visualizer.create_correlation_matrix(**params)
+            result = visualizer.create_correlation_matrix(**params, output='bytes')
         elif viz_type == 'pie':
-            result = visualizer.create_pie_chart(**params)
+            result = visualizer.create_pie_chart(**params, output='bytes')
         elif viz_type == 'dashboard':
-            result = visualizer.create_dashboard(params)
+            result = visualizer.create_dashboard(params, output='bytes')
         else:
             return jsonify({'error': f'Unknown visualization type: {viz_type}'}), 400
         
-        return jsonify({'plotly_json': result})
+        return Response(b'{"plotly_json":' + result + b'}', mimetype='application/json')
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -253,10 +378,10 @@ def create_visualization():
 def get_available_visualizations():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         visualizer = data_info['visualizer']
         
         available_viz = visualizer.get_available_visualizations()
@@ -270,10 +395,10 @@ def get_available_visualizations():
 def export_data():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         processor = data_info['processor']
         
         export_format = request.json.get('format', 'csv')
@@ -298,10 +423,10 @@ def export_data():
 def aggregate_data():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         processor = data_info['processor']
         
         group_by = request.json.get('group_by', [])
@@ -310,14 +435,14 @@ def aggregate_data():
         # Aggregate data
         aggregated_df = processor.aggregate_data(group_by, aggregations)
         
-        data_info['dataframe'] = aggregated_df
-        data_info['processor'] = DataProcessor(aggregated_df)
-        data_info['visualizer'] = DataVisualizer(aggregated_df)
-        data_info['kql_engine'] = KQLEngine(aggregated_df)
+        _set_dataframe(data_info, aggregated_df, session_id)
+        
+        if _wants_arrow():
+            return arrow_response(aggregated_df)
         
         response_data = {
             'message': 'Data aggregated successfully',
-            'data': aggregated_df.fillna('').to_dict('records'),
+            'data': _to_records(aggregated_df),
             'columns': list(aggregated_df.columns),
             'shape': {'rows': len(aggregated_df), 'columns': len(aggregated_df.columns)}
         }
@@ -331,10 +456,10 @@ def aggregate_data():
 def filter_data():
     try:
         session_id = session.get('session_id')
-        if not session_id or session_id not in data_store:
+        data_info = data_store.get(session_id) if session_id else None
+        if data_info is None:
             return jsonify({'error': 'No data available. Please upload a file first.'}), 400
         
-        data_info = data_store[session_id]
         processor = data_info['processor']
         
         conditions = request.json.get('conditions', [])
@@ -342,14 +467,14 @@ def filter_data():
         # Filter data
         filtered_df = processor.filter_data(conditions)
         
-        data_info['dataframe'] = filtered_df
-        data_info['processor'] = DataProcessor(filtered_df)
-        data_info['visualizer'] = DataVisualizer(filtered_df)
-        data_info['kql_engine'] = KQLEngine(filtered_df)
+        _set_dataframe(data_info, filtered_df, session_id)
+        
+        if _wants_arrow():
+            return arrow_response(filtered_df)
         
         response_data = {
             'message': 'Data filtered successfully',
-            'data': filtered_df.fillna('').to_dict('records'),
+            'data': _to_records(filtered_df),
             'columns': list(filtered_df.columns),
             'shape': {'rows': len(filtered_df), 'columns': len(filtered_df.columns)}
         }
@@ -364,12 +489,14 @@ def clear_session():
     """Clear current session"""
     try:
         session_id = session.get('session_id')
-        if session_id and session_id in data_store:
-            file_path = Path(data_store[session_id]['file_path'])
-            if file_path.exists():
-                file_path.unlink()
-            
-            del data_store[session_id]
+        if session_id:
+            try:
+                # Also deletes the upload and any spilled copy on disk
+                del data_store[session_id]
+            except KeyError:
+                # Already expired and cleaned up by idle eviction
+                pass
+            kql_results.invalidate(session_id)
         
         session.clear()
         
@@ -6,6 +6,9 @@ class Config:
     BASE_DIR = Path(__file__).parent
     UPLOAD_FOLDER = BASE_DIR / 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB chunks when streaming uploads to disk
+    PARSED_CACHE_FOLDER = UPLOAD_FOLDER / '.parsed'
+    PARSED_CACHE_MAX_ENTRIES = 16  # parsed uploads kept for re-upload dedup
     
     # Allowed file extensions
     ALLOWED_EXTENSIONS = {
@@ -19,9 +22,19 @@ class Config:
         'json': 'application/json'
     }
     
+    # Response compression
+    COMPRESS_MIMETYPES = {'application/json', 'application/vnd.apache.arrow.stream'}
+    COMPRESS_MIN_SIZE = 1024  # bytes; smaller bodies are sent as-is
+    COMPRESS_LEVEL = 4
+    
+    # Session store configurations
+    SESSION_MAX_ACTIVE = 8  # sessions kept in memory before LRU eviction
+    SESSION_IDLE_TIMEOUT = 60 * 60  # seconds before an idle session is evicted
+    
     # KQL configurations
     KQL_DEFAULT_TABLE = 'Data'
     KQL_TIMEOUT = 30  # seconds
+    KQL_RESULT_CACHE_BYTES = 64 * 1024 * 1024  # serialized query results kept for repeat queries
     
     # Visualization defaults
     DEFAULT_CHART_WIDTH = 1200
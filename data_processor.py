@@ -2,15 +2,100 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional
 import json
+import re
+import warnings
 from datetime import datetime
-from scipy import stats
+
+NUMERIC_PATTERN = r'\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*'
+REGEX_METACHARACTERS = re.compile(r'[.^$*+?()\[\]{}|\\]')
+MAX_CORRELATION_COLUMNS = 50
+AGGREGATION_FUNCTIONS = ('sum', 'mean', 'median', 'min', 'max', 'count', 'std')
+CATEGORICAL_MAX_RATIO = 0.05  # unique/rows ratio below which text columns become categorical
+SUMMARY_BLOCK_BYTES = 8 * 1024 * 1024  # float64 bytes per column block in _numeric_summary
+SUMMARY_KEYS = ('mean', 'std', 'min', 'max', 'median', 'q1', 'q3', 'skew', 'kurtosis')
+
+def _correlation_matrix(numeric_df: pd.DataFrame) -> pd.DataFrame:
+    """Pearson correlation on a float32 copy; pairwise pandas path when NaNs are present"""
+    X = np.empty(numeric_df.shape, dtype=np.float32)
+    for j, col in enumerate(numeric_df.columns):
+        values = numeric_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if np.isnan(values).any():
+            return numeric_df.corr()
+        # Centre in float64 first: a large offset (epoch seconds, big IDs) would swamp float32's precision
+        X[:, j] = values - values.mean() if len(values) else values
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.corrcoef(X, rowvar=False)
+    return pd.DataFrame(corr, index=numeric_df.columns, columns=numeric_df.columns)
+
+def _numeric_summary(numeric_df: pd.DataFrame) -> pd.DataFrame:
+    """Moments and quartiles of every numeric column, computed over float64 column blocks.
+    
+    Matches pandas' sample std, skew and kurtosis (bias-adjusted, NaN-skipping).
+    """
+    rows = max(len(numeric_df), 1)
+    step = max(1, SUMMARY_BLOCK_BYTES // (rows * 8))
+    blocks = [_summarize_block(numeric_df.iloc[:, j:j + step].to_numpy(dtype=np.float64, na_value=np.nan))
+              for j in range(0, numeric_df.shape[1], step)]
+    summary = {key: np.concatenate([block[key] for block in blocks]) if blocks else np.array([])
+               for key in SUMMARY_KEYS}
+    return pd.DataFrame(summary, index=numeric_df.columns)
+
+def _summarize_block(X: np.ndarray) -> Dict[str, np.ndarray]:
+    """Summary of one block, reusing two scratch buffers for every pass"""
+    if len(X) == 0:
+        X = np.full((1, X.shape[1]), np.nan)
+    valid = ~np.isnan(X)
+    n = valid.sum(axis=0).astype(np.float64)
+    
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        
+        dev = np.where(valid, X, 0.0)
+        mean = dev.sum(axis=0) / n
+        np.subtract(dev, mean, out=dev)
+        np.copyto(dev, 0.0, where=~valid)
+        dev2 = np.multiply(dev, dev)
+        m2 = dev2.sum(axis=0)
+        m3 = np.einsum('ij,ij->j', dev2, dev)
+        m4 = np.einsum('ij,ij->j', dev2, dev2)
+        del dev2
+        
+        std = np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)
+        skew = np.where(m2 == 0, 0.0, n * np.sqrt(n - 1) / (n - 2) * m3 / m2 ** 1.5)
+        skew = np.where(n < 3, np.nan, skew)
+        kurt = ((n + 1) * n * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 ** 2)
+                - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+        kurt = np.where(m2 == 0, 0.0, kurt)
+        kurt = np.where(n < 4, np.nan, kurt)
+        
+        minimum = np.where(n > 0, np.min(X, axis=0, initial=np.inf, where=valid), np.nan)
+        maximum = np.where(n > 0, np.max(X, axis=0, initial=-np.inf, where=valid), np.nan)
+        
+        # Quantiles partition the scratch copy in place instead of copying X again
+        np.copyto(dev, X)
+        q1, median, q3 = np.nanquantile(dev, [0.25, 0.5, 0.75], axis=0, overwrite_input=True)
+    
+    return {'mean': mean, 'std': std, 'min': minimum, 'max': maximum, 'median': median,
+            'q1': q1, 'q3': q3, 'skew': skew, 'kurtosis': kurt}
 
 class DataProcessor:
     
     def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
-        self.original_df = df.copy()
+        # Operations below replace columns/frames rather than writing into them,
+        # so a shallow copy is enough to keep the caller's frame untouched
+        self.df = df.copy(deep=False)
+        self.original_df = df
         self.transformations = []
+        # Bumped whenever self.df is replaced in place so cached results go stale
+        self._version = 0
+        self._stats_cache = None
+    
+    def set_dataframe(self, df: pd.DataFrame):
+        """Point the processor at a new frame, keeping its transformation history"""
+        self.df = df.copy(deep=False)
+        self._version += 1
+        self._stats_cache = None
     
     def clean_data(self, methods: Dict[str, Any] = None) -> pd.DataFrame:
         default_methods = {
@@ -20,7 +105,8 @@ class DataProcessor:
             'remove_outliers': False,
             'outlier_method': 'zscore',  # zscore or iqr
             'zscore_threshold': 3,
-            'convert_types': True
+            'convert_types': True,
+            'categorize': True  # low-cardinality text columns -> category dtype
         }
         
         if methods:
@@ -57,57 +143,76 @@ class DataProcessor:
                     else:
                         fill_value = methods['fill_value']
                     
-                    self.df[col].fillna(fill_value, inplace=True)
+                    self.df[col] = self.df[col].fillna(fill_value)
         
         if methods['remove_outliers']:
-            numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+            numeric_df = self.df.select_dtypes(include=[np.number])
             
-            for col in numeric_cols:
-                if methods['outlier_method'] == 'zscore':
-                    z_scores = np.abs(stats.zscore(self.df[col].dropna()))
-                    mask = z_scores < methods['zscore_threshold']
-                    valid_indices = self.df[col].dropna().index[mask]
-                    self.df = self.df.loc[valid_indices]
-                elif methods['outlier_method'] == 'iqr':
-                    Q1 = self.df[col].quantile(0.25)
-                    Q3 = self.df[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower_bound = Q1 - 1.5 * IQR
-                    upper_bound = Q3 + 1.5 * IQR
-                    mask = (self.df[col] >= lower_bound) & (self.df[col] <= upper_bound)
-                    self.df = self.df[mask]
+            if methods['outlier_method'] == 'zscore' and not numeric_df.empty:
+                # Score every numeric column in one pass and slice the frame once
+                X = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+                mu = np.nanmean(X, axis=0)
+                sd = np.nanstd(X, axis=0)
+                sd[sd == 0] = 1.0  # constant columns have no outliers
+                z_scores = np.abs((X - mu) / sd)
+                keep = (z_scores < methods['zscore_threshold']).all(axis=1)
+                self.df = self.df[keep]
+            elif methods['outlier_method'] == 'iqr' and not numeric_df.empty:
+                quartiles = numeric_df.quantile([0.25, 0.75])
+                Q1 = quartiles.loc[0.25].to_numpy(dtype=np.float64)
+                Q3 = quartiles.loc[0.75].to_numpy(dtype=np.float64)
+                IQR = Q3 - Q1
+                lower_bound = Q1 - 1.5 * IQR
+                upper_bound = Q3 + 1.5 * IQR
+                X = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+                keep = ((X >= lower_bound) & (X <= upper_bound)).all(axis=1)
+                self.df = self.df[keep]
         
         # Convert data types
         if methods['convert_types']:
-            for col in self.df.columns:
-                #convert to numeric
-                try:
-                    self.df[col] = pd.to_numeric(self.df[col], errors='ignore')
-                except:
-                    pass
+            # Only text columns can need converting; probe a small sample before
+            # attempting a full-column conversion
+            for col in self.df.select_dtypes(include=['object', 'string']).columns:
+                sample = self.df[col].dropna().head(50)
+                if sample.empty:
+                    continue
                 
-                # convert to datetime
                 try:
-                    self.df[col] = pd.to_datetime(self.df[col], errors='ignore')
-                except:
+                    if sample.astype(str).str.fullmatch(NUMERIC_PATTERN).all():
+                        self.df[col] = pd.to_numeric(self.df[col])
+                    elif pd.to_datetime(sample, errors='coerce', format='ISO8601').notna().all():
+                        self.df[col] = pd.to_datetime(self.df[col], format='ISO8601')
+                except (ValueError, TypeError):
                     pass
         
+        if methods['categorize'] and len(self.df):
+            for col in self.df.select_dtypes(include=['object', 'string']).columns:
+                n_unique = self.df[col].nunique(dropna=False)
+                if n_unique / len(self.df) < CATEGORICAL_MAX_RATIO:
+                    self.df[col] = self.df[col].astype('category')
+        
+        self._version += 1
+        
         return self.df
     
     def aggregate_data(self, group_by: List[str], 
                       aggregations: Dict[str, List[str]]) -> pd.DataFrame:
         
+        # Columns with several functions get one output column per function
         agg_dict = {}
         for col, agg_funcs in aggregations.items():
             if col in self.df.columns:
-                for func in agg_funcs:
-                    if func in ['sum', 'mean', 'median', 'min', 'max', 'count', 'std']:
-                        agg_dict[col] = func
+                funcs = [func for func in dict.fromkeys(agg_funcs) if func in AGGREGATION_FUNCTIONS]
+                for func in funcs:
+                    name = col if len(funcs) == 1 else f'{col}_{func}'
+                    agg_dict[name] = pd.NamedAgg(column=col, aggfunc=func)
         
         if not agg_dict:
-            agg_dict = {col: 'mean' for col in self.df.select_dtypes(include=[np.number]).columns}
+            agg_dict = {col: pd.NamedAgg(column=col, aggfunc='mean')
+                        for col in self.df.select_dtypes(include=[np.number]).columns}
         
-        aggregated = self.df.groupby(group_by).agg(agg_dict).reset_index()
+        # Hash grouping without sorting keys or expanding unused categories
+        aggregated = self.df.groupby(group_by, sort=False, observed=True).agg(**agg_dict).reset_index()
         
         self.transformations.append({
             'operation': 'aggregate_data',
@@ -144,7 +249,7 @@ class DataProcessor:
     
     def filter_data(self, conditions: List[Dict[str, Any]]) -> pd.DataFrame:
         
-        mask = pd.Series([True] * len(self.df))
+        mask = np.ones(len(self.df), dtype=bool)
         
         for condition in conditions:
             column = condition.get('column')
@@ -155,19 +260,35 @@ class DataProcessor:
                 continue
             
             if operator == 'equals':
-                mask &= (self.df[column] == value)
+                cond = (self.df[column] == value)
             elif operator == 'not_equals':
-                mask &= (self.df[column] != value)
+                cond = (self.df[column] != value)
             elif operator == 'greater_than':
-                mask &= (self.df[column] > value)
+                cond = (self.df[column] > value)
             elif operator == 'less_than':
-                mask &= (self.df[column] < value)
+                cond = (self.df[column] < value)
             elif operator == 'contains':
-                mask &= self.df[column].astype(str).str.contains(str(value), case=False)
+                series = self.df[column]
+                if not pd.api.types.is_string_dtype(series):
+                    series = series.astype(str)
+                needle = str(value)
+                # Plain substrings skip the regex engine entirely
+                if REGEX_METACHARACTERS.search(needle) is None:
+                    cond = series.str.contains(needle, case=False, regex=False, na=False)
+                else:
+                    cond = series.str.contains(re.compile(needle, re.IGNORECASE), na=False)
             elif operator == 'in':
-                mask &= self.df[column].isin(value)
+                cond = self.df[column].isin(value)
             elif operator == 'not_in':
-                mask &= ~self.df[column].isin(value)
+                cond = ~self.df[column].isin(value)
+            else:
+                continue
+            
+            # Missing values never match a condition
+            np.logical_and(mask, cond.to_numpy(dtype=bool, na_value=False), out=mask)
+            
+            if not mask.any():
+                break
         
         filtered_df = self.df[mask]
         
@@ -181,6 +302,9 @@ class DataProcessor:
         return filtered_df
     
     def calculate_statistics(self) -> Dict[str, Any]:
+        cache_key = (id(self.df), self._version)
+        if self._stats_cache is not None and self._stats_cache[0] == cache_key:
+            return self._stats_cache[1]
         
         stats_dict = {
             'overall': {
@@ -194,44 +318,54 @@ class DataProcessor:
             'missing_data': {}
         }
         
+        # Column-wise reductions computed once for the whole frame; the null
+        # counts also feed the missing-data summary below
+        null_counts = self.df.isnull().sum()
+        nunique = self.df.nunique()
+        numeric_df = self.df.select_dtypes(include=[np.number])
+        num_stats = _numeric_summary(numeric_df)
+        
         # Column statistics
         for col in self.df.columns:
             col_stats = {
                 'dtype': str(self.df[col].dtype),
-                'unique_values': int(self.df[col].nunique()),
-                'missing_values': int(self.df[col].isnull().sum()),
-                'missing_percentage': float((self.df[col].isnull().sum() / len(self.df)) * 100)
+                'unique_values': int(nunique[col]),
+                'missing_values': int(null_counts[col]),
+                'missing_percentage': float((null_counts[col] / len(self.df)) * 100)
             }
             
-            if pd.api.types.is_numeric_dtype(self.df[col]):
+            if col in num_stats.index:
+                col_num = num_stats.loc[col]
                 col_stats.update({
-                    'mean': float(self.df[col].mean()),
-                    'std': float(self.df[col].std()),
-                    'min': float(self.df[col].min()),
-                    'max': float(self.df[col].max()),
-                    'median': float(self.df[col].median()),
-                    'q1': float(self.df[col].quantile(0.25)),
-                    'q3': float(self.df[col].quantile(0.75)),
-                    'skew': float(self.df[col].skew()),
-                    'kurtosis': float(self.df[col].kurtosis())
+                    'mean': float(col_num['mean']),
+                    'std': float(col_num['std']),
+                    'min': float(col_num['min']),
+                    'max': float(col_num['max']),
+                    'median': float(col_num['median']),
+                    'q1': float(col_num['q1']),
+                    'q3': float(col_num['q3']),
+                    'skew': float(col_num['skew']),
+                    'kurtosis': float(col_num['kurtosis'])
                 })
             
             if pd.api.types.is_string_dtype(self.df[col]):
+                value_counts = self.df[col].value_counts(sort=True)
                 col_stats.update({
-                    'most_common': self.df[col].mode().iloc[0] if not self.df[col].mode().empty else None,
-                    'most_common_count': int(self.df[col].value_counts().iloc[0]) if not self.df[col].value_counts().empty else 0
+                    'most_common': value_counts.index[0] if len(value_counts) else None,
+                    'most_common_count': int(value_counts.iloc[0]) if len(value_counts) else 0
                 })
             
             stats_dict['columns'][col] = col_stats
         
-        numeric_df = self.df.select_dtypes(include=[np.number])
-        if len(numeric_df.columns) > 1:
-            corr_matrix = numeric_df.corr()
-            stats_dict['correlation_matrix'] = corr_matrix.to_dict()
+        # The matrix (and its JSON payload) grows quadratically, so wide frames skip it
+        if 1 < len(numeric_df.columns) <= MAX_CORRELATION_COLUMNS:
+            stats_dict['correlation_matrix'] = _correlation_matrix(numeric_df).to_dict()
         
-        missing_pattern = self.df.isnull().sum().sort_values(ascending=False)
+        missing_pattern = null_counts.sort_values(ascending=False)
         stats_dict['missing_data']['pattern'] = missing_pattern.to_dict()
-        stats_dict['missing_data']['total_missing'] = int(self.df.isnull().sum().sum())
+        stats_dict['missing_data']['total_missing'] = int(null_counts.sum())
+        
+        self._stats_cache = (cache_key, stats_dict)
         
         return stats_dict
     
@@ -1,15 +1,113 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from typing import Dict, Any, List, Optional
 import re
 from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+
+# where-clause grammar: `<column> <operator> <value>`, clauses joined by `and`
+AND_SPLIT_RE = re.compile(r'\s+and\s+', re.IGNORECASE)
+PREDICATE_RE = re.compile(
+    r'^\s*(?P<column>.+?)\s*(?P<op>==|!=|>=|<=|=|>|<|\bcontains\b|\bstartswith\b|\bendswith\b)\s*(?P<value>.+?)\s*$',
+    re.IGNORECASE
+)
+STRING_OPERATORS = {'contains', 'startswith', 'endswith'}
+# Ordered comparisons as Series methods, for columns eval() can't order (unordered categoricals)
+ORDERED_OPERATORS = {'>': 'gt', '>=': 'ge', '<': 'lt', '<=': 'le'}
+# (lower bound side, upper bound side) for searchsorted on a sorted column
+SORTED_SLICE_SIDES = {
+    '>': ('right', None),
+    '>=': ('left', None),
+    '<': (None, 'left'),
+    '<=': (None, 'right'),
+    '=': ('left', 'right'),
+    '==': ('left', 'right')
+}
+FUNC_RE = re.compile(r'(\w+)\s*(.*)', re.S)
+
+# summarize grammar: `[name =] func(column), ... by key, ...`
+BY_SPLIT_RE = re.compile(r'(?:^|\s+)by\s+', re.IGNORECASE)
+AGGREGATION_RE = re.compile(r'^\s*(?:(?P<name>\w+)\s*=\s*)?(?P<func>\w+)\s*\(\s*(?P<column>[^)]*)\)\s*$')
+AGGREGATION_ALIASES = {'avg': 'mean', 'stdev': 'std'}
+ARROW_GROUPBY_MIN_ROWS = 100_000
+ARROW_AGGREGATIONS = {
+    'count': ('count', None),
+    'dcount': ('count_distinct', None),
+    'sum': ('sum', None),
+    'mean': ('mean', None),
+    'min': ('min', None),
+    'max': ('max', None),
+    'std': ('stddev', pc.VarianceOptions(ddof=1))
+}
+ARROW_STRING = pd.StringDtype('pyarrow')
+CATEGORICAL_MAX_RATIO = 0.5  # unique/rows ratio below which text columns are queried as categoricals
 
 class KQLEngine:
     
     def __init__(self, df: pd.DataFrame, table_name: str = 'Data'):
-        self.df = df.copy()
+        # Operators always return new frames, so the input is shared rather than copied
+        self.df = df
         self.table_name = table_name
         self.functions = self._initialize_functions()
+        self._query_df = None
+        self._monotonic_cols = set()
+        self._query_dtypes = {}
+    
+    def set_dataframe(self, df: pd.DataFrame):
+        # Operators never write to self.df, so the new frame can be shared as-is
+        self.df = df
+        self._query_df = None
+        self._monotonic_cols = set()
+        self._query_dtypes = {}
+    
+    def _prepared_df(self) -> pd.DataFrame:
+        """self.df with repetitive text columns as categoricals, built on first query"""
+        if self._query_df is None:
+            converted = {}
+            if len(self.df):
+                for col in self.df.select_dtypes(include=['object', 'string']).columns:
+                    try:
+                        unique_ratio = self.df[col].nunique() / len(self.df)
+                    except TypeError:
+                        # Unhashable cells (lists for mv_expand) stay as they are
+                        continue
+                    if unique_ratio < CATEGORICAL_MAX_RATIO:
+                        converted[col] = self.df[col].astype('category')
+                    elif self.df[col].dtype != ARROW_STRING:
+                        # Arrow-backed strings run str predicates on native UTF-8 kernels
+                        try:
+                            converted[col] = self.df[col].astype(ARROW_STRING)
+                        except (TypeError, ValueError):
+                            pass
+            self._query_df = self.df.assign(**converted) if converted else self.df
+            # column -> (query dtype, source dtype)
+            self._query_dtypes = {col: (values.dtype, self.df[col].dtype) for col, values in converted.items()}
+            
+            # Sorted numeric/datetime columns let range predicates binary-search instead of scan
+            sortable = self._query_df.select_dtypes(include=[np.number, 'datetime', 'datetimetz']).columns
+            self._monotonic_cols = {
+                col for col in sortable
+                if not pd.api.types.is_bool_dtype(self._query_df[col]) and self._query_df[col].is_monotonic_increasing
+            }
+        return self._query_df
+    
+    def _restore_dtypes(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Cast columns the query frame re-typed back to their source dtypes, so results match the session frame"""
+        restored = {}
+        for col, (query_dtype, source_dtype) in self._query_dtypes.items():
+            if col not in result.columns:
+                continue
+            dtype = result[col].dtype
+            # Columns an operator replaced (extend x = ...) keep whatever type they now have
+            if dtype == query_dtype or (isinstance(dtype, pd.CategoricalDtype) and isinstance(query_dtype, pd.CategoricalDtype)):
+                try:
+                    restored[col] = result[col].astype(source_dtype)
+                except (TypeError, ValueError):
+                    pass
+        return result.assign(**restored) if restored else result
     
     def _initialize_functions(self) -> Dict[str, Any]:
         return {
@@ -21,6 +119,8 @@ class KQLEngine:
             'take': self._take,
             'count': self._count,
             'distinct': self._distinct,
+            '_distinct_count': self._distinct_count,
+            '_distinct_values': self._distinct_values,
             'join': self._join,
             'union': self._union,
             'sample': self._sample,
@@ -31,13 +131,18 @@ class KQLEngine:
     
     def execute_query(self, query: str) -> pd.DataFrame:
         try:
-            # Parse query into operations
-            operations = self._parse_query(query)
-            result = self.df.copy()
+            # Parse and optimize query into operations (cached per query string)
+            operations = self._compile_query(query.strip())
+            
+            # A leading table reference just names the frame this engine holds
+            if operations and operations[0]['function'] == self.table_name.lower() and not operations[0]['args']:
+                operations = operations[1:]
+            
+            result = self._prepared_df()
             
             for operation in operations:
                 func_name = operation['function']
-                args = operation.get('args', [])
+                args = operation.get('args', ())
                 kwargs = operation.get('kwargs', {})
                 
                 if func_name in self.functions:
@@ -45,14 +150,81 @@ class KQLEngine:
                 else:
                     raise ValueError(f"Unknown function: {func_name}")
             
-            return result
+            return self._restore_dtypes(result)
             
         except Exception as e:
             raise ValueError(f"Query execution error: {str(e)}")
     
-    def _parse_query(self, query: str) -> List[Dict[str, Any]]:
-        # Normalize query
-        query = query.strip()
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compile_query(query: str) -> tuple:
+        """Parsed and optimized plan; shared between calls, so never mutate it"""
+        return KQLEngine._optimize_plan(KQLEngine._parse_query(query))
+    
+    @staticmethod
+    def _optimize_plan(operations: tuple) -> tuple:
+        operations = list(operations)
+        
+        # Push each where as early as it can go so later operators see fewer rows
+        for i in range(1, len(operations)):
+            j = i
+            while j > 0 and KQLEngine._where_commutes(operations[j], operations[j - 1]):
+                operations[j - 1], operations[j] = operations[j], operations[j - 1]
+                j -= 1
+        
+        # Fuse adjacent operator pairs that have a cheaper combined form
+        fused = []
+        for operation in operations:
+            previous = fused[-1] if fused else None
+            single_distinct = (previous is not None and previous['function'] == 'distinct'
+                               and len(previous['args']) == 1 and isinstance(previous['args'][0], str))
+            if single_distinct and operation['function'] == 'count' and not operation['args']:
+                # Only the number of keys is needed, not the first row of each
+                fused[-1] = MappingProxyType({
+                    'function': '_distinct_count', 'args': previous['args'], 'kwargs': MappingProxyType({})
+                })
+            elif single_distinct and operation['function'] == 'project' and operation['args'] == previous['args']:
+                fused[-1] = MappingProxyType({
+                    'function': '_distinct_values', 'args': previous['args'], 'kwargs': MappingProxyType({})
+                })
+            elif (operation['function'] == 'take' and operation['args'] and previous is not None
+                    and previous['function'] == 'sort' and len(previous['args']) == 1):
+                # A sort feeding a take only needs the first n rows
+                fused[-1] = MappingProxyType({
+                    'function': 'top',
+                    'args': (operation['args'][0], previous['args'][0]),
+                    'kwargs': MappingProxyType({'by': previous['kwargs'].get('order', 'asc')})
+                })
+            else:
+                fused.append(operation)
+        
+        return tuple(fused)
+    
+    @staticmethod
+    def _where_commutes(operation, previous) -> bool:
+        """Whether a where can run before the operator preceding it with the same result"""
+        if operation['function'] != 'where' or not operation['args']:
+            return False
+        
+        if previous['function'] == 'sort':
+            return True
+        
+        if previous['function'] == 'project':
+            projected = set()
+            for arg in previous['args']:
+                projected.update(arg if isinstance(arg, list) else [arg])
+            
+            for clause in AND_SPLIT_RE.split(operation['args'][0].strip()):
+                match = PREDICATE_RE.match(clause)
+                if not match or match.group('column').strip() not in projected:
+                    return False
+            return True
+        
+        return False
+    
+    @staticmethod
+    def _parse_query(query: str) -> tuple:
+        """Parse a query into a read-only plan"""
         parts = query.split('|')
         operations = []
         
@@ -62,60 +234,102 @@ class KQLEngine:
                 continue
             
             # Parse function and arguments
-            match = re.match(r'(\w+)\s*(.*)', part)
+            match = FUNC_RE.match(part)
             if match:
                 func_name = match.group(1).lower()
                 arg_string = match.group(2).strip()
                 
-                # Parse arguments
-                args, kwargs = self._parse_arguments(arg_string)
+                # Parse arguments; a where predicate is one expression, not an argument list
+                if func_name in ('where', 'summarize'):
+                    args, kwargs = ([arg_string] if arg_string else []), {}
+                elif func_name == 'extend':
+                    # Each assignment is kept whole so '=' isn't mistaken for a keyword argument
+                    args, kwargs = [t for t in KQLEngine._split_arguments(arg_string) if t], {}
+                elif func_name in ('sort', 'top'):
+                    args, kwargs = KQLEngine._parse_sort_arguments(func_name, arg_string)
+                else:
+                    args, kwargs = KQLEngine._parse_arguments(arg_string)
                 
-                operations.append({
+                operations.append(MappingProxyType({
                     'function': func_name,
-                    'args': args,
-                    'kwargs': kwargs
-                })
+                    'args': tuple(args),
+                    'kwargs': MappingProxyType(kwargs)
+                }))
         
-        return operations
+        return tuple(operations)
     
-    def _parse_arguments(self, arg_string: str) -> tuple:
-        args = []
-        kwargs = {}
+    @staticmethod
+    def _parse_sort_arguments(func_name: str, arg_string: str) -> tuple:
+        """Split 'sort by a, b desc' / 'top n by a desc' into columns and a direction"""
+        count, _, clause = arg_string.partition(' by ') if func_name == 'top' else ('', '', arg_string)
+        clause = re.sub(r'^by\s+', '', clause.strip(), flags=re.IGNORECASE)
         
-        if not arg_string:
-            return args, kwargs
+        args = [KQLEngine._parse_value(count.strip())] if func_name == 'top' else []
+        order = None
+        for column in clause.split(','):
+            words = column.split()
+            if len(words) > 1 and words[-1].lower() in ('asc', 'desc'):
+                order = words.pop().lower()
+            if words:
+                args.append(' '.join(words))
         
+        if order is None:
+            return args, {}
+        return args, {'by' if func_name == 'top' else 'order': order}
+    
+    @staticmethod
+    def _split_arguments(arg_string: str) -> list:
+        """Split on commas outside parentheses, jumping between separators with str.find"""
         tokens = []
-        current_token = ""
-        paren_depth = 0
-        
-        for char in arg_string:
-            if char == '(':
-                paren_depth += 1
-            elif char == ')':
-                paren_depth -= 1
+        start = 0
+        depth = 0
+        n = len(arg_string)
+        next_comma = arg_string.find(',')
+        next_open = arg_string.find('(')
+        next_close = arg_string.find(')')
+        
+        while True:
+            pos = min((p for p in (next_comma, next_open, next_close) if p >= 0), default=-1)
+            if pos < 0:
+                break
             
-            if char == ',' and paren_depth == 0:
-                tokens.append(current_token.strip())
-                current_token = ""
+            if pos == next_open:
+                depth += 1
+                next_open = arg_string.find('(', pos + 1)
+            elif pos == next_close:
+                depth -= 1
+                next_close = arg_string.find(')', pos + 1)
             else:
-                current_token += char
+                if depth == 0:
+                    tokens.append(arg_string[start:pos].strip())
+                    start = pos + 1
+                next_comma = arg_string.find(',', pos + 1)
+        
+        if start < n:
+            tokens.append(arg_string[start:].strip())
+        return tokens
+    
+    @staticmethod
+    def _parse_arguments(arg_string: str) -> tuple:
+        args = []
+        kwargs = {}
         
-        if current_token:
-            tokens.append(current_token.strip())
+        if not arg_string:
+            return args, kwargs
         
-        for token in tokens:
+        for token in KQLEngine._split_arguments(arg_string):
             if '=' in token:
                 key, value = token.split('=', 1)
                 key = key.strip()
-                value = self._parse_value(value.strip())
+                value = KQLEngine._parse_value(value.strip())
                 kwargs[key] = value
             else:
-                args.append(self._parse_value(token))
+                args.append(KQLEngine._parse_value(token))
         
         return args, kwargs
     
-    def _parse_value(self, value: str) -> Any:
+    @staticmethod
+    def _parse_value(value: str) -> Any:
         # strings
         if value.startswith("'") and value.endswith("'"):
             return value[1:-1]
@@ -140,7 +354,7 @@ class KQLEngine:
         # lists
         if value.startswith('(') and value.endswith(')'):
             items = value[1:-1].split(',')
-            return [self._parse_value(item.strip()) for item in items]
+            return [KQLEngine._parse_value(item.strip()) for item in items]
         
         return value
     
@@ -152,115 +366,174 @@ class KQLEngine:
         condition = args[0]
         
         if isinstance(condition, str):
-            condition = condition.replace('==', '=').replace('!=', '!=')
+            comparisons = []
+            local_dict = {}
+            masks = []
+            text_columns = {}
             
-            conditions = condition.split('and')
+            clauses = [self._parse_predicate(clause) for clause in AND_SPLIT_RE.split(condition.strip())]
+            if df is self._query_df and self._monotonic_cols:
+                df, clauses = self._slice_sorted(df, clauses)
             
-            mask = pd.Series([True] * len(df))
+            for i, (col, op, val) in enumerate(clauses):
+                if op in ('=', '==', '!=') and isinstance(df[col].dtype, pd.CategoricalDtype):
+                    # Compare integer category codes instead of the labels
+                    codes = df[col].cat.codes.to_numpy()
+                    categories = df[col].cat.categories
+                    code = categories.get_loc(val) if val in categories else None
+                    if op == '!=':
+                        clause_mask = codes != code if code is not None else np.ones(len(df), dtype=bool)
+                    else:
+                        clause_mask = codes == code if code is not None else np.zeros(len(df), dtype=bool)
+                    masks.append(clause_mask)
+                elif op in STRING_OPERATORS or (op in ORDERED_OPERATORS and isinstance(df[col].dtype, pd.CategoricalDtype)):
+                    # Cast each column at most once, however many clauses use it
+                    if col not in text_columns:
+                        text_columns[col] = df[col] if df[col].dtype == ARROW_STRING else df[col].astype(ARROW_STRING)
+                    text = text_columns[col]
+                    
+                    if op in ORDERED_OPERATORS:
+                        # Categories are unordered, so order the labels as strings like the original column
+                        clause_mask = getattr(text, ORDERED_OPERATORS[op])(val)
+                    elif op == 'contains':
+                        clause_mask = text.str.contains(str(val), case=False, regex=False)
+                    elif op == 'startswith':
+                        clause_mask = text.str.startswith(str(val))
+                    else:
+                        clause_mask = text.str.endswith(str(val))
+                    masks.append(clause_mask.to_numpy(dtype=bool, na_value=False))
+                else:
+                    # Comparisons are fused into one eval pass (numexpr when installed)
+                    name = f'v{i}'
+                    local_dict[name] = val
+                    comparisons.append(f'(`{col}` {"==" if op == "=" else op} @{name})')
             
-            for cond in conditions:
-                cond = cond.strip()
-                
-                if '=' in cond and not '!=' in cond and not '>=' in cond and not '<=' in cond:
-                    col, val = cond.split('=', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= (df[col] == val)
-                
-                elif '!=' in cond:
-                    col, val = cond.split('!=', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= (df[col] != val)
-                
-                elif '>=' in cond:
-                    col, val = cond.split('>=', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= (df[col] >= val)
-                
-                elif '<=' in cond:
-                    col, val = cond.split('<=', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= (df[col] <= val)
-                
-                elif '>' in cond:
-                    col, val = cond.split('>', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= (df[col] > val)
-                
-                elif '<' in cond:
-                    col, val = cond.split('<', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= (df[col] < val)
-                
-                elif 'contains' in cond:
-                    col, val = cond.split('contains', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= df[col].astype(str).str.contains(str(val), case=False)
-                
-                elif 'startswith' in cond:
-                    col, val = cond.split('startswith', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= df[col].astype(str).str.startswith(str(val))
-                
-                elif 'endswith' in cond:
-                    col, val = cond.split('endswith', 1)
-                    col = col.strip()
-                    val = self._parse_value(val.strip())
-                    mask &= df[col].astype(str).str.endswith(str(val))
+            if comparisons:
+                fused = df.eval(' & '.join(comparisons), local_dict=local_dict)
+                masks.append(fused.to_numpy(dtype=bool, na_value=False))
             
-            return df[mask]
+            if not masks:
+                return df
+            
+            # One reduction over plain bool arrays, then a positional take
+            mask = masks[0] if len(masks) == 1 else np.logical_and.reduce(masks)
+            return df.iloc[np.flatnonzero(mask)]
         
         return df
     
+    def _slice_sorted(self, df: pd.DataFrame, clauses: list) -> tuple:
+        """Apply range/equality clauses on sorted columns as one iloc slice, returning the rest"""
+        lo, hi = 0, len(df)
+        remaining = []
+        
+        for col, op, val in clauses:
+            comparable = pd.api.types.is_datetime64_any_dtype(df[col]) or (
+                isinstance(val, (int, float)) and not isinstance(val, bool)
+            )
+            if col not in self._monotonic_cols or op not in SORTED_SLICE_SIDES or not comparable:
+                remaining.append((col, op, val))
+                continue
+            
+            try:
+                bounds = [df[col].searchsorted(val, side=side) if side else None
+                          for side in SORTED_SLICE_SIDES[op]]
+            except (TypeError, ValueError):
+                remaining.append((col, op, val))
+                continue
+            
+            if bounds[0] is not None:
+                lo = max(lo, int(bounds[0]))
+            if bounds[1] is not None:
+                hi = min(hi, int(bounds[1]))
+        
+        return df.iloc[lo:max(lo, hi)], remaining
+    
+    def _parse_predicate(self, clause: str) -> tuple:
+        match = PREDICATE_RE.match(clause)
+        if not match:
+            raise ValueError(f"Unsupported where clause: {clause.strip()}")
+        
+        col = match.group('column').strip()
+        op = match.group('op').lower()
+        val = self._parse_value(match.group('value').strip())
+        return col, op, val
+    
     def _summarize(self, df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
         """Aggregate data"""
         if not args:
             return df
         
-        agg_expr = args[0]
+        parts = BY_SPLIT_RE.split(args[0].strip(), maxsplit=1)
+        agg_part, by_part = parts[0], (parts[1] if len(parts) > 1 else '')
+        group_by = [col for col in self._split_arguments(by_part) if col]
         
-        agg_dict = {}
-        group_by = []
+        aggregations = []
+        for expr in self._split_arguments(agg_part):
+            match = AGGREGATION_RE.match(expr)
+            if not match:
+                continue
+            kql_name = match.group('func').lower()
+            func_name = AGGREGATION_ALIASES.get(kql_name, kql_name)
+            source_col = match.group('column').strip()
+            if func_name not in ('count', 'dcount', 'sum', 'mean', 'min', 'max', 'std', 'median'):
+                continue
+            result_col = (match.group('name') or '').strip() or (
+                'count_' if func_name == 'count' else f'{kql_name}_{source_col}'
+            )
+            aggregations.append((result_col, func_name, source_col))
         
-        for expr in agg_expr.split(','):
-            expr = expr.strip()
-            
-            if '=' in expr:
-                result_col, func_expr = expr.split('=', 1)
-                result_col = result_col.strip()
-                
-                # function
-                if '(' in func_expr and ')' in func_expr:
-                    func_name = func_expr.split('(')[0].strip()
-                    source_col = func_expr.split('(')[1].split(')')[0].strip()
-                    
-                    if func_name == 'count':
-                        agg_dict[result_col] = pd.NamedAgg(column=source_col, aggfunc='size')
-                    elif func_name in ['sum', 'mean', 'min', 'max', 'std', 'median']:
-                        agg_dict[result_col] = pd.NamedAgg(column=source_col, aggfunc=func_name)
-                    elif func_name == 'dcount':
-                        agg_dict[result_col] = pd.NamedAgg(column=source_col, aggfunc='nunique')
+        if not aggregations:
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            aggregations = [(col, 'mean', col) for col in numeric_cols]
+        
+        if not group_by:
+            row = {}
+            for result_col, func_name, source_col in aggregations:
+                if func_name == 'count':
+                    row[result_col] = len(df) if not source_col else int(df[source_col].count())
+                elif func_name == 'dcount':
+                    row[result_col] = df[source_col].nunique()
+                else:
+                    row[result_col] = getattr(df[source_col], func_name)()
+            return pd.DataFrame([row])
+        
+        if len(df) >= ARROW_GROUPBY_MIN_ROWS and all(func in ARROW_AGGREGATIONS for _, func, _ in aggregations):
+            return self._summarize_arrow(df, group_by, aggregations)
+        
+        agg_dict = {}
+        for result_col, func_name, source_col in aggregations:
+            if func_name == 'count':
+                agg_dict[result_col] = pd.NamedAgg(column=source_col or group_by[0],
+                                                   aggfunc='count' if source_col else 'size')
+            elif func_name == 'dcount':
+                agg_dict[result_col] = pd.NamedAgg(column=source_col, aggfunc='nunique')
             else:
-                group_by.append(expr)
+                agg_dict[result_col] = pd.NamedAgg(column=source_col, aggfunc=func_name)
         
-        if not agg_dict:
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            for col in numeric_cols:
-                agg_dict[col] = pd.NamedAgg(column=col, aggfunc='mean')
+        # KQL leaves summarize row order unspecified; sorting keys dominates high-cardinality group-bys
+        return df.groupby(group_by, observed=True, sort=False).agg(**agg_dict).reset_index()
+    
+    def _summarize_arrow(self, df: pd.DataFrame, group_by: list, aggregations: list) -> pd.DataFrame:
+        """Grouped aggregation on Arrow's multithreaded hash aggregator"""
+        source_cols = {source for _, func, source in aggregations if source}
+        table = pa.Table.from_pandas(df[group_by + [c for c in source_cols if c not in group_by]],
+                                     preserve_index=False)
         
-        if group_by:
-            result = df.groupby(group_by).agg(**agg_dict).reset_index()
-        else:
-            result = df.agg(agg_dict).reset_index()
+        specs = []
+        for _, func_name, source_col in aggregations:
+            arrow_func, options = ARROW_AGGREGATIONS[func_name]
+            if func_name == 'count' and not source_col:
+                specs.append(([], 'count_all'))
+            else:
+                specs.append((source_col, arrow_func, options) if options else (source_col, arrow_func))
         
-        return result
+        grouped = table.group_by(group_by).aggregate(specs).to_pandas()
+        
+        # Arrow names outputs '<column>_<func>' and puts keys first; match the pandas layout
+        agg_cols = [col for col in grouped.columns if col not in group_by]
+        grouped = grouped.rename(columns=dict(zip(agg_cols, [name for name, _, _ in aggregations])))
+        grouped = grouped[group_by + [name for name, _, _ in aggregations]]
+        return grouped.dropna(subset=group_by).reset_index(drop=True)
     
     def _project(self, df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
         if not args:
@@ -282,7 +555,8 @@ class KQLEngine:
             return df
     
     def _extend(self, df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
-        result = df.copy()
+        # New columns only; existing blocks stay shared with df
+        result = df.copy(deep=False)
         
         for arg in args:
             if isinstance(arg, str) and '=' in arg:
@@ -297,22 +571,32 @@ class KQLEngine:
                     elif expression.startswith('toupper('):
                         inner = expression[8:-1]
                         result[col_name] = df[inner].astype(str).str.upper()
-                    elif '+' in expression:
-                        parts = expression.split('+')
-                        result[col_name] = sum(df[p.strip()] for p in parts if p.strip() in df.columns)
-                    elif '*' in expression:
-                        parts = expression.split('*')
-                        product = 1
-                        for p in parts:
-                            p = p.strip()
-                            if p in df.columns:
-                                product *= df[p]
-                        result[col_name] = product
+                    else:
+                        try:
+                            # One compiled pass over the columns (numexpr when installed), no per-operator temporaries
+                            result[col_name] = df.eval(expression)
+                        except Exception:
+                            result[col_name] = self._extend_fallback(df, expression)
                 except:
                     pass
         
         return result
     
+    def _extend_fallback(self, df: pd.DataFrame, expression: str) -> pd.Series:
+        """Column-wise sum or product for expressions eval can't compile"""
+        if '+' in expression:
+            parts = expression.split('+')
+            return sum(df[p.strip()] for p in parts if p.strip() in df.columns)
+        elif '*' in expression:
+            parts = expression.split('*')
+            product = 1
+            for p in parts:
+                p = p.strip()
+                if p in df.columns:
+                    product *= df[p]
+            return product
+        raise ValueError(f"Unsupported extend expression: {expression}")
+    
     def _sort(self, df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
         if not args:
             return df.sort_index()
@@ -350,6 +634,18 @@ class KQLEngine:
             return df.drop_duplicates(subset=columns)
         return df.drop_duplicates()
     
+    def _distinct_count(self, df: pd.DataFrame, column: str) -> pd.DataFrame:
+        """distinct column | count, as one hash pass over the column"""
+        if column not in df.columns:
+            return self._count(self._distinct(df, column))
+        return pd.DataFrame({'count': [df[column].nunique(dropna=False)]})
+    
+    def _distinct_values(self, df: pd.DataFrame, column: str) -> pd.DataFrame:
+        """distinct column | project column, without carrying the other columns along"""
+        if column not in df.columns:
+            return self._project(self._distinct(df, column), column)
+        return pd.DataFrame({column: df[column].unique()})
+    
     def _sample(self, df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
         if args:
             n = int(args[0])
@@ -364,6 +660,9 @@ class KQLEngine:
             
             if column in df.columns:
                 ascending = by.lower() != 'desc'
+                if not pd.api.types.is_numeric_dtype(df[column]) or pd.api.types.is_bool_dtype(df[column]):
+                    # nlargest/nsmallest only select on numbers
+                    return df.sort_values(by=column, ascending=ascending).head(n)
                 return df.nlargest(n, column) if not ascending else df.nsmallest(n, column)
         
         return df.head(10)
@@ -378,8 +677,9 @@ class KQLEngine:
     def _mv_expand(self, df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
         if args:
             column = args[0]
-            if column in df.columns and df[column].apply(lambda x: isinstance(x, list)).any():
-                return df.explode(column)
+            if column in df.columns:
+                # explode passes scalars through, so no per-row list check is needed
+                return df.explode(column, ignore_index=True)
         return df
     
     def _join(self, df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
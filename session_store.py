@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+
+import pandas as pd
+
+from config import Config
+
+class SessionStore:
+
+    def __init__(self, max_sessions: int = None, idle_timeout: int = None,
+                 loader: Callable[[pd.DataFrame], Dict[str, Any]] = None):
+        self.max_sessions = max_sessions or Config.SESSION_MAX_ACTIVE
+        self.idle_timeout = idle_timeout or Config.SESSION_IDLE_TIMEOUT
+        # Rebuilds a session's engines from a frame reloaded off disk
+        self.loader = loader
+        self._sessions = OrderedDict()
+        self._spilled = {}
+        self._last_access = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            self._evict_idle()
+            return session_id in self._sessions or session_id in self._spilled
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            if session_id in self._spilled:
+                self._sessions[session_id] = self._restore(session_id)
+                self._evict_lru(keep=session_id)
+            data_info = self._sessions[session_id]
+            self._touch(session_id)
+            return data_info
+
+    def __setitem__(self, session_id: str, data_info: Dict[str, Any]):
+        with self._lock:
+            self._spilled.pop(session_id, None)
+            self._sessions[session_id] = data_info
+            self._touch(session_id)
+            self._evict_idle()
+            self._evict_lru(keep=session_id)
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            if session_id not in self._sessions and session_id not in self._spilled:
+                raise KeyError(session_id)
+            self._remove(session_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions) + len(self._spilled)
+
+    def get(self, session_id: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if session_id not in self:
+                return default
+            return self[session_id]
+
+    def _touch(self, session_id: str):
+        self._sessions.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+
+    def _evict_lru(self, keep: str = None):
+        """Spill least recently used sessions to disk until under the cap"""
+        while len(self._sessions) > self.max_sessions:
+            oldest = next(sid for sid in self._sessions if sid != keep)
+            self._spill(oldest)
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [sid for sid, ts in self._last_access.items() if ts < cutoff]
+        for session_id in expired:
+            self._remove(session_id)
+
+    def _spill(self, session_id: str):
+        """Write the session's current frame to Parquet and release it from memory"""
+        data_info = self._sessions.pop(session_id)
+        spill_path = Path(f"{data_info['file_path']}.session.parquet")
+
+        if self.loader is None:
+            self._drop_files(data_info['file_path'])
+            self._last_access.pop(session_id, None)
+            return
+
+        try:
+            data_info['dataframe'].to_parquet(spill_path, compression='zstd', use_dictionary=True)
+        except Exception:
+            # Frames pyarrow can't represent are dropped rather than kept in memory
+            self._drop_files(data_info['file_path'], spill_path)
+            self._last_access.pop(session_id, None)
+            return
+
+        self._spilled[session_id] = {
+            'file_path': data_info['file_path'],
+            'metadata': data_info.get('metadata'),
+            'spill_path': str(spill_path)
+        }
+
+    def _restore(self, session_id: str) -> Dict[str, Any]:
+        spilled = self._spilled.pop(session_id)
+        spill_path = Path(spilled['spill_path'])
+
+        df = pd.read_parquet(spill_path)
+        spill_path.unlink()
+
+        data_info = self.loader(df)
+        data_info['file_path'] = spilled['file_path']
+        data_info['metadata'] = spilled['metadata']
+        return data_info
+
+    def _remove(self, session_id: str):
+        """Drop a session and every file backing it"""
+        data_info = self._sessions.pop(session_id, None) or self._spilled.pop(session_id)
+        self._last_access.pop(session_id, None)
+        self._drop_files(data_info['file_path'], data_info.get('spill_path'))
+
+    @staticmethod
+    def _drop_files(*paths):
+        for path in paths:
+            if path and Path(path).exists():
+                Path(path).unlink()
+
+class ResultCache:
+    """Query results keyed on (session_id, frame version, query), bounded by their size in bytes"""
+
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = max_bytes or Config.KQL_RESULT_CACHE_BYTES
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: tuple, value: Any, nbytes: int = None):
+        """Cache a result; nbytes defaults to len(value), for bytes payloads"""
+        nbytes = len(value) if nbytes is None else nbytes
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._size += nbytes
+
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+
+    def invalidate(self, session_id: str):
+        """Drop every cached result belonging to a session"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == session_id]:
+                self._size -= self._entries.pop(key)[1]
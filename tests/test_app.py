@@ -0,0 +1,118 @@
+import gzip
+import io
+import json
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+import app as app_module
+from config import Config
+from session_store import ResultCache
+from upload_handler import FileUploadHandler, ParsedUploadCache
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'UPLOAD_FOLDER', tmp_path)
+    monkeypatch.setattr(app_module, 'parsed_uploads', ParsedUploadCache(tmp_path / '.parsed'))
+    return app_module.app.test_client()
+
+
+def _upload(client, rows=200):
+    content = 'id,name,score\n' + ''.join(f'{i},name{i},{i * 1.5}\n' for i in range(rows))
+    response = client.post('/upload', data={'file': (io.BytesIO(content.encode()), 'data.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+
+
+def test_large_json_is_gzipped_when_accepted(client):
+    _upload(client)
+
+    response = client.get('/preview?rows=100', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(json.loads(gzip.decompress(response.data))['data']) == 100
+
+
+def test_response_is_plain_without_gzip_accept_encoding(client):
+    _upload(client)
+
+    response = client.get('/preview?rows=100', headers={'Accept-Encoding': 'br'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.get_json()['data']) == 100
+
+
+def test_small_response_is_not_compressed(client):
+    response = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(response.data) < Config.COMPRESS_MIN_SIZE
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['status'] == 'healthy'
+
+
+def test_preview_and_query_can_be_read_as_arrow_streams(client):
+    _upload(client)
+
+    preview = client.get('/preview?rows=5&page=2&format=arrow')
+    query = client.post('/kql/query?format=arrow', json={'query': 'Data | where score > 290 | project id, name'})
+
+    assert preview.mimetype == 'application/vnd.apache.arrow.stream'
+    assert preview.headers['X-Total-Rows'] == '200'
+    assert pa.ipc.open_stream(preview.data).read_all().column('id').to_pylist() == [5, 6, 7, 8, 9]
+    table = pa.ipc.open_stream(query.data).read_all()
+    assert table.column_names == ['id', 'name']
+    assert table.column('id').to_pylist() == [194, 195, 196, 197, 198, 199]
+
+
+def test_stream_upload_saves_raw_body(client, tmp_path):
+    response = client.post('/upload/stream?filename=data.csv', data=b'id,name\n1,a\n2,b\n',
+                           content_type='application/octet-stream')
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['metadata']['row_count'] == 2
+    assert body['metadata']['columns'] == ['id', 'name']
+    assert (tmp_path / body['metadata']['file_name']).read_bytes() == b'id,name\n1,a\n2,b\n'
+    assert client.get('/preview').get_json()['data'] == [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]
+
+
+def test_stream_upload_rejects_unsupported_extension(client, tmp_path):
+    response = client.post('/upload/stream', data=b'MZ', headers={'X-Filename': 'tool.exe'})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'File type not supported: .exe'
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_duplicate_upload_reuses_parse_but_keeps_its_source_file(client, monkeypatch):
+    parsed = []
+    process_file = FileUploadHandler.process_file
+    monkeypatch.setattr(FileUploadHandler, 'process_file', lambda self, path: parsed.append(path) or process_file(self, path))
+    content = b'id,name\n1,a\n2,b\n'
+    first = client.post('/upload/stream?filename=one.csv', data=content).get_json()
+    second = client.post('/upload/stream?filename=two.csv', data=content).get_json()
+
+    for body in (first, second):
+        assert Path(body['metadata']['file_path']).read_bytes() == content
+    assert second['metadata']['file_name'].endswith('two.csv')
+    assert second['metadata']['row_count'] == 2
+    assert len(parsed) == 1
+
+
+def test_kql_cache_hit_matches_fresh_result_and_is_dropped_on_filter(client, monkeypatch):
+    cache = ResultCache()
+    monkeypatch.setattr(app_module, 'kql_results', cache)
+    client.post('/upload/stream?filename=data.csv', data=b'id,status,when\n1,ok,2024-01-01\n2,fail,2024-01-02\n3,ok,\n')
+    query = {'query': 'Data | where id > 1 | project status, when'}
+
+    fresh = client.post('/kql/query', json=query).get_json()
+    cached = client.post('/kql/query', json=query).get_json()
+    assert cached == fresh
+    assert len(cache._entries) == 1
+
+    client.post('/filter', json={'conditions': [{'column': 'status', 'operator': 'equals', 'value': 'ok'}]})
+
+    assert len(cache._entries) == 0 and cache._size == 0
@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processor
+from data_processor import DataProcessor
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5, 6],
+        'value': [10.0, 12.5, np.nan, 11.0, 13.5, 9.0],
+        'score': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        'category': ['a', 'b', 'a', 'c', 'a', 'b']
+    })
+
+
+def test_calculate_statistics_is_cached(sample_df):
+    processor = DataProcessor(sample_df)
+
+    first = processor.calculate_statistics()
+    second = processor.calculate_statistics()
+
+    assert first is second
+    assert first['columns']['value']['missing_values'] == 1
+
+
+def test_calculate_statistics_invalidated_by_clean(sample_df):
+    processor = DataProcessor(pd.concat([sample_df, sample_df.head(2)]))
+
+    before = processor.calculate_statistics()
+    processor.clean_data({'fill_missing': None, 'convert_types': False})
+    after = processor.calculate_statistics()
+
+    assert after is not before
+    assert before['overall']['total_rows'] == 8
+    assert after['overall']['total_rows'] == 6
+
+
+def test_calculate_statistics_numeric_columns(sample_df):
+    stats = DataProcessor(sample_df).calculate_statistics()
+    value = stats['columns']['value']
+
+    assert value['mean'] == pytest.approx(sample_df['value'].mean())
+    assert value['std'] == pytest.approx(sample_df['value'].std())
+    assert value['median'] == pytest.approx(sample_df['value'].median())
+    assert value['q1'] == pytest.approx(sample_df['value'].quantile(0.25))
+    assert value['q3'] == pytest.approx(sample_df['value'].quantile(0.75))
+    assert value['skew'] == pytest.approx(sample_df['value'].skew())
+    assert value['kurtosis'] == pytest.approx(sample_df['value'].kurtosis())
+    assert 'mean' not in stats['columns']['category']
+    assert stats['columns']['category']['unique_values'] == 3
+
+
+def test_numeric_summary_is_blockwise_consistent(sample_df, monkeypatch):
+    numeric = sample_df[['id', 'value', 'score']]
+    whole = data_processor._numeric_summary(numeric)
+
+    monkeypatch.setattr(data_processor, 'SUMMARY_BLOCK_BYTES', 1)
+    per_column = data_processor._numeric_summary(numeric)
+
+    pd.testing.assert_frame_equal(per_column, whole)
+    assert per_column.loc['value', 'q3'] == pytest.approx(sample_df['value'].quantile(0.75))
+    assert per_column.loc['id', 'kurtosis'] == pytest.approx(sample_df['id'].kurtosis())
+
+
+def test_clean_data_removes_zscore_outliers():
+    df = pd.DataFrame({
+        'x': [1.0] * 20 + [100.0],
+        'constant': [5.0] * 21
+    })
+    processor = DataProcessor(df)
+
+    cleaned = processor.clean_data({
+        'remove_outliers': True,
+        'outlier_method': 'zscore',
+        'remove_duplicates': False,
+        'convert_types': False
+    })
+
+    assert len(cleaned) == 20
+    assert cleaned['x'].max() == 1.0
+
+
+def test_clean_data_removes_iqr_outliers():
+    df = pd.DataFrame({
+        'x': [1.0, 2.0, 3.0, 4.0, 5.0, 50.0],
+        'y': [-40.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    })
+    processor = DataProcessor(df)
+
+    cleaned = processor.clean_data({
+        'remove_outliers': True,
+        'outlier_method': 'iqr',
+        'remove_duplicates': False,
+        'convert_types': False
+    })
+
+    assert cleaned['x'].tolist() == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_clean_data_fills_missing_without_touching_input(sample_df):
+    processor = DataProcessor(sample_df)
+
+    cleaned = processor.clean_data({'fill_missing': 'median', 'convert_types': False})
+
+    assert cleaned['value'].isnull().sum() == 0
+    assert cleaned.loc[2, 'value'] == pytest.approx(sample_df['value'].median())
+    assert sample_df['value'].isnull().sum() == 1
+    assert processor.original_df is sample_df
+
+
+def test_filter_data_combines_conditions(sample_df):
+    processor = DataProcessor(sample_df.set_index('id'))
+
+    filtered = processor.filter_data([
+        {'column': 'category', 'operator': 'in', 'value': ['a', 'b']},
+        {'column': 'value', 'operator': 'greater_than', 'value': 9.5},
+        {'column': 'category', 'operator': 'contains', 'value': 'A'},
+        {'column': 'missing', 'operator': 'equals', 'value': 1}
+    ])
+
+    assert filtered.index.tolist() == [1, 5]
+    assert processor.transformations[-1]['rows_filtered'] == 4
+
+
+def test_clean_data_converts_text_columns():
+    df = pd.DataFrame({
+        'amount': ['1.5', '2', '-3e2'],
+        'when': ['2024-01-01', '2024-01-02 10:30:00', '2024-02-01'],
+        'mixed': ['1', '2', 'three'],
+        'label': ['a', 'b', 'c']
+    })
+    processor = DataProcessor(df)
+
+    cleaned = processor.clean_data({'remove_duplicates': False})
+
+    assert pd.api.types.is_float_dtype(cleaned['amount'])
+    assert pd.api.types.is_datetime64_any_dtype(cleaned['when'])
+    assert cleaned['mixed'].tolist() == ['1', '2', 'three']
+    assert cleaned['label'].tolist() == ['a', 'b', 'c']
+
+
+def test_correlation_matrix_matches_pandas(sample_df):
+    stats = DataProcessor(sample_df.dropna()).calculate_statistics()
+    expected = sample_df.dropna()[['id', 'value', 'score']].corr()
+
+    corr = pd.DataFrame(stats['correlation_matrix'])
+
+    np.testing.assert_allclose(corr.loc[expected.index, expected.columns], expected, rtol=1e-5)
+
+
+def test_correlation_matrix_survives_large_offsets():
+    rng = np.random.default_rng(0)
+    steps = np.arange(1000)
+    df = pd.DataFrame({'ts': 1_700_000_000 + steps, 'y': steps * 2.0 + rng.normal(0, 20, 1000)})
+
+    corr = pd.DataFrame(DataProcessor(df).calculate_statistics()['correlation_matrix'])
+
+    assert corr.loc['ts', 'y'] == pytest.approx(df['ts'].corr(df['y']), abs=1e-5)
+
+
+def test_calculate_statistics_most_common(sample_df):
+    stats = DataProcessor(sample_df).calculate_statistics()
+
+    assert stats['columns']['category']['most_common'] == 'a'
+    assert stats['columns']['category']['most_common_count'] == 3
+
+
+def test_clean_data_categorizes_low_cardinality_text():
+    df = pd.DataFrame({
+        'status': ['ok', 'fail'] * 50,
+        'user': [f'user{i}' for i in range(100)]
+    })
+    processor = DataProcessor(df)
+
+    cleaned = processor.clean_data({'remove_duplicates': False})
+
+    assert isinstance(cleaned['status'].dtype, pd.CategoricalDtype)
+    assert not isinstance(cleaned['user'].dtype, pd.CategoricalDtype)
+    assert len(processor.filter_data([{'column': 'status', 'operator': 'equals', 'value': 'ok'}])) == 50
+
+
+def test_aggregate_data_keeps_every_function(sample_df):
+    processor = DataProcessor(sample_df)
+
+    aggregated = processor.aggregate_data(['category'], {
+        'score': ['sum', 'max', 'sum'],
+        'value': ['mean'],
+        'id': ['unknown']
+    })
+
+    assert list(aggregated.columns) == ['category', 'score_sum', 'score_max', 'value']
+    row = aggregated.set_index('category').loc['a']
+    assert row['score_sum'] == 9.0
+    assert row['score_max'] == 5.0
+    assert row['value'] == pytest.approx(11.75)
+
+
+def test_set_dataframe_invalidates_statistics(sample_df):
+    processor = DataProcessor(sample_df)
+    before = processor.calculate_statistics()
+
+    processor.set_dataframe(processor.filter_data([
+        {'column': 'category', 'operator': 'equals', 'value': 'a'}
+    ]))
+    after = processor.calculate_statistics()
+
+    assert before['overall']['total_rows'] == 6
+    assert after['overall']['total_rows'] == 3
+    assert processor.transformations[-1]['operation'] == 'filter_data'
+
+
+def test_filter_data_contains_literal_and_pattern():
+    processor = DataProcessor(pd.DataFrame({
+        'name': ['Alice', 'bob', None, 'ALINA'],
+        'code': [101, 202, 303, 110]
+    }))
+
+    literal = processor.filter_data([{'column': 'name', 'operator': 'contains', 'value': 'ali'}])
+    pattern = processor.filter_data([{'column': 'name', 'operator': 'contains', 'value': '^b.b$'}])
+    numeric = processor.filter_data([{'column': 'code', 'operator': 'contains', 'value': '10'}])
+
+    assert literal['name'].tolist() == ['Alice', 'ALINA']
+    assert pattern['name'].tolist() == ['bob']
+    assert numeric['code'].tolist() == [101, 110]
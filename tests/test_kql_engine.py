@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import kql_engine
+from kql_engine import KQLEngine
+
+
+@pytest.fixture
+def events_df():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5, 6],
+        'status': ['success', 'failed', 'success', 'success', 'failed', 'success'],
+        'brand': ['Acme', 'Globex', 'acme corp', 'Initech', 'Acme', 'Umbrella'],
+        'value': [120.0, 80.0, 300.0, 95.5, 410.0, 150.0]
+    })
+
+
+def test_where_combines_comparisons_and_string_ops(events_df):
+    engine = KQLEngine(events_df)
+
+    result = engine.execute_query('where status == "success" and value >= 100 and brand contains "acme"')
+
+    assert result['id'].tolist() == [1, 3]
+
+
+def test_where_single_equals_and_not_equals(events_df):
+    engine = KQLEngine(events_df)
+
+    assert engine.execute_query("where status = 'failed'")['id'].tolist() == [2, 5]
+    assert engine.execute_query("where status != 'failed' and id < 4")['id'].tolist() == [1, 3]
+
+
+def test_where_unknown_column_raises(events_df):
+    engine = KQLEngine(events_df)
+
+    with pytest.raises(ValueError):
+        engine.execute_query('where missing > 1')
+
+
+def test_parsed_plans_are_cached_and_skip_table_name(events_df):
+    engine = KQLEngine(events_df)
+    KQLEngine._compile_query.cache_clear()
+
+    first = engine.execute_query('Data | where value > 100 | project id, value')
+    second = engine.execute_query('Data | where value > 100 | project id, value')
+
+    assert KQLEngine._compile_query.cache_info().hits == 1
+    assert first['id'].tolist() == second['id'].tolist() == [1, 3, 5, 6]
+    assert list(first.columns) == ['id', 'value']
+
+
+def test_where_is_pushed_before_sort_and_project():
+    plan = KQLEngine._compile_query('sort by value | project id, value | where value > 100 | take 2')
+
+    assert [op['function'] for op in plan] == ['where', 'sort', 'project', 'take']
+
+
+def test_where_on_unprojected_column_stays_after_project():
+    plan = KQLEngine._compile_query('project id | where value > 100')
+
+    assert [op['function'] for op in plan] == ['project', 'where']
+
+
+def test_execute_query_does_not_copy_or_mutate_source(events_df):
+    engine = KQLEngine(events_df)
+
+    result = engine.execute_query('where value > 100')
+
+    assert engine.df is events_df
+    assert events_df['status'].dtype == object or pd.api.types.is_string_dtype(events_df['status'])
+    assert len(result) == 4
+    assert len(events_df) == 6
+
+
+def test_where_on_categorical_column_compares_codes(events_df):
+    engine = KQLEngine(events_df)
+
+    assert isinstance(engine._prepared_df()['status'].dtype, pd.CategoricalDtype)
+    assert engine.execute_query('where status == "failed"')['id'].tolist() == [2, 5]
+    assert engine.execute_query('where status != "failed"')['id'].tolist() == [1, 3, 4, 6]
+    assert engine.execute_query('where status == "unknown"').empty
+
+
+def test_where_orders_categorical_columns_as_strings(events_df):
+    engine = KQLEngine(events_df)
+
+    assert engine.execute_query("where status > 'f'")['id'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert engine.execute_query("where status >= 'success'")['id'].tolist() == [1, 3, 4, 6]
+    assert engine.execute_query("where status < 'g' and value > 100")['id'].tolist() == [5]
+
+
+def test_results_keep_source_dtypes(events_df):
+    events_df['note'] = [f'n{i}' for i in range(6)]
+    engine = KQLEngine(events_df)
+
+    filtered = engine.execute_query('where status == "success" and note != "n9"')
+    summarized = engine.execute_query('summarize total=sum(value) by status')
+    extended = engine.execute_query('extend status = id * 2')
+
+    assert isinstance(engine._prepared_df()['status'].dtype, pd.CategoricalDtype)
+    for result in (filtered, summarized):
+        assert result['status'].dtype == events_df['status'].dtype
+    assert filtered['note'].dtype == events_df['note'].dtype
+    assert filtered['status'].tolist() == ['success'] * 4
+    assert pd.api.types.is_integer_dtype(extended['status'])
+
+
+def test_where_contains_treats_value_literally():
+    engine = KQLEngine(pd.DataFrame({
+        'path': ['/api/v1.0', '/api/v100', '/static/a+b.css', None],
+        'hits': [1, 2, 3, 4]
+    }))
+
+    assert engine._prepared_df()['path'].dtype == pd.StringDtype('pyarrow')
+    assert engine.execute_query('where path contains "v1."')['hits'].tolist() == [1]
+    assert engine.execute_query('where path contains "A+B"')['hits'].tolist() == [3]
+
+
+def test_sort_then_take_is_fused_into_top(events_df):
+    plan = KQLEngine._compile_query('sort by value desc | take 2')
+
+    assert [op['function'] for op in plan] == ['top']
+    assert KQLEngine(events_df).execute_query('sort by value desc | take 2')['id'].tolist() == [5, 3]
+    assert KQLEngine(events_df).execute_query('sort by brand | take 2')['id'].tolist() == [1, 5]
+
+
+def test_extend_evaluates_arithmetic(events_df):
+    result = KQLEngine(events_df).execute_query('extend doubled = value * 2, total = id + value, up = toupper(status)')
+
+    assert result['doubled'].tolist() == (events_df['value'] * 2).tolist()
+    assert result['total'].tolist() == (events_df['id'] + events_df['value']).tolist()
+    assert result['up'].iloc[0] == 'SUCCESS'
+    assert 'doubled' not in events_df.columns
+
+
+def test_distinct_count_uses_single_column(events_df):
+    engine = KQLEngine(events_df)
+
+    plan = KQLEngine._compile_query('distinct brand | count')
+    assert [op['function'] for op in plan] == ['_distinct_count']
+    assert engine.execute_query('distinct brand | count')['count'].tolist() == [5]
+    assert engine.execute_query('distinct status | project status')['status'].tolist() == ['success', 'failed']
+
+
+def test_parse_arguments_splits_outside_parentheses():
+    args, kwargs = KQLEngine._parse_arguments('g(h(1,2),3), (1, 2), name, n=5')
+
+    assert args == ['g(h(1,2),3)', [1, 2], 'name']
+    assert kwargs == {'n': 5}
+
+
+def test_summarize_by_matches_on_pandas_and_arrow_paths(events_df, monkeypatch):
+    query = 'summarize count(), total = sum(value), avg(value) by status'
+    expected = KQLEngine(events_df).execute_query(query)
+
+    monkeypatch.setattr(kql_engine, 'ARROW_GROUPBY_MIN_ROWS', 1)
+    arrow = KQLEngine(events_df).execute_query(query)
+
+    assert list(expected.columns) == ['status', 'count_', 'total', 'avg_value']
+    assert expected.set_index('status').loc['failed', 'count_'] == 2
+    pd.testing.assert_frame_equal(arrow.set_index('status').sort_index(), expected.set_index('status').sort_index())
+
+
+def test_extend_shares_existing_columns(events_df):
+    engine = KQLEngine(events_df)
+    result = engine.execute_query('extend doubled = value * 2')
+
+    assert np.shares_memory(result['value'].to_numpy(), events_df['value'].to_numpy())
+    assert 'doubled' not in engine.df.columns
+
+
+def test_where_slices_sorted_columns():
+    df = pd.DataFrame({
+        'ts': pd.date_range('2024-01-01', periods=10, freq='D'),
+        'n': range(10),
+        'f': [3, 1, 2, 5, 4, 6, 7, 8, 9, 0]
+    })
+    engine = KQLEngine(df)
+
+    assert engine.execute_query('where n >= 3 and n < 7 and f > 4')['n'].tolist() == [3, 5, 6]
+    assert engine.execute_query('where ts > "2024-01-03" and ts <= "2024-01-05"')['n'].tolist() == [3, 4]
+    assert engine.execute_query('where n == 20').empty
+    assert engine._monotonic_cols == {'ts', 'n'}
+
+
+def test_mv_expand_explodes_lists_and_keeps_scalars():
+    df = pd.DataFrame({'id': [1, 2, 3], 'tags': [['a', 'b'], 'c', []]})
+
+    result = KQLEngine(df).execute_query('mv_expand tags')
+
+    assert result['id'].tolist() == [1, 1, 2, 3]
+    assert result['tags'].tolist()[:3] == ['a', 'b', 'c']
+    assert result.index.tolist() == [0, 1, 2, 3]
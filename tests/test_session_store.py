@@ -0,0 +1,72 @@
+import pandas as pd
+
+from session_store import SessionStore, ResultCache
+
+
+def _data_info(tmp_path, name):
+    file_path = tmp_path / name
+    file_path.write_text('a\n1\n')
+    return {'file_path': str(file_path)}
+
+
+def test_least_recently_used_session_is_evicted(tmp_path):
+    store = SessionStore(max_sessions=2)
+    store['s1'] = _data_info(tmp_path, 'one.csv')
+    store['s2'] = _data_info(tmp_path, 'two.csv')
+
+    store['s1']
+    store['s3'] = _data_info(tmp_path, 'three.csv')
+
+    assert 's1' in store
+    assert 's2' not in store
+    assert not (tmp_path / 'two.csv').exists()
+
+
+def test_idle_session_is_evicted(tmp_path):
+    store = SessionStore(idle_timeout=1)
+    store['s1'] = _data_info(tmp_path, 'one.csv')
+    store._last_access['s1'] -= 5
+
+    assert 's1' not in store
+    assert len(store) == 0
+
+
+def test_get_misses_an_idle_session_without_raising(tmp_path):
+    store = SessionStore(idle_timeout=1)
+    store['s1'] = _data_info(tmp_path, 'one.csv')
+    store._last_access['s1'] -= 5
+
+    assert store.get('s1') is None
+    assert not (tmp_path / 'one.csv').exists()
+
+
+def test_evicted_session_is_spilled_and_restored(tmp_path):
+    store = SessionStore(max_sessions=1, loader=lambda df: {'dataframe': df})
+    first = _data_info(tmp_path, 'one.csv')
+    first['dataframe'] = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'x']})
+    store['s1'] = first
+    store['s2'] = {'file_path': str(tmp_path / 'two.csv'), 'dataframe': pd.DataFrame()}
+
+    assert (tmp_path / 'one.csv.session.parquet').exists()
+    assert 's1' in store
+
+    restored = store['s1']
+
+    pd.testing.assert_frame_equal(restored['dataframe'], first['dataframe'])
+    assert restored['file_path'] == first['file_path']
+    assert not (tmp_path / 'one.csv.session.parquet').exists()
+
+
+def test_result_cache_respects_byte_budget():
+    cache = ResultCache(max_bytes=10)
+    cache.put(('s1', 0, 'take 1'), b'12345')
+    cache.put(('s1', 0, 'take 2'), b'12345')
+    cache.put(('s2', 0, 'take 1'), b'12345')
+
+    assert cache.get(('s1', 0, 'take 1')) is None
+    assert cache.get(('s1', 0, 'take 2')) == b'12345'
+
+    cache.invalidate('s1')
+
+    assert cache.get(('s1', 0, 'take 2')) is None
+    assert cache.get(('s2', 0, 'take 1')) == b'12345'
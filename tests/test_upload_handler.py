@@ -0,0 +1,157 @@
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kql_engine import KQLEngine
+from upload_handler import FileUploadHandler, ParsedUploadCache, save_stream
+
+
+def test_save_stream_returns_content_digest(tmp_path):
+    content = b'a,b\n1,x\n' * 1000
+    target = tmp_path / 'data.csv'
+
+    digest = save_stream(io.BytesIO(content), target, chunk_size=64)
+
+    assert target.read_bytes() == content
+    assert digest == hashlib.sha256(content).hexdigest()
+
+
+def test_save_stream_leaves_no_file_when_stream_fails(tmp_path):
+    class BrokenStream(io.BytesIO):
+        def read(self, size=-1):
+            if self.tell():
+                raise ConnectionError('client went away')
+            return super().read(size)
+
+    target = tmp_path / 'data.csv'
+
+    with pytest.raises(ConnectionError):
+        save_stream(BrokenStream(b'a,b\n' * 100), target, chunk_size=8)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parsed_upload_cache_misses_when_file_vanishes(tmp_path):
+    cache = ParsedUploadCache(tmp_path)
+    cache.put('digest', pd.DataFrame({'a': [1]}), {})
+
+    (tmp_path / 'digest.parquet').unlink()
+
+    assert cache.get('digest') is None
+
+
+def test_parsed_upload_cache_purges_files_from_previous_run(tmp_path):
+    ParsedUploadCache(tmp_path).put('digest', pd.DataFrame({'a': [1]}), {})
+
+    cache = ParsedUploadCache(tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
+    assert cache.get('digest') is None
+
+
+def test_parsed_upload_cache_put_keeps_existing_entry(tmp_path):
+    cache = ParsedUploadCache(tmp_path)
+    cache.put('digest', pd.DataFrame({'a': [1]}), {'row_count': 1})
+
+    cache.put('digest', pd.DataFrame({'a': [2, 3]}), {'row_count': 2})
+
+    df, metadata = cache.get('digest')
+    assert df['a'].tolist() == [1] and metadata == {'row_count': 1}
+    assert [p.name for p in tmp_path.iterdir()] == ['digest.parquet']
+
+
+def test_parsed_upload_cache_evicts_oldest(tmp_path):
+    cache = ParsedUploadCache(tmp_path, max_entries=1)
+    df = pd.DataFrame({'a': [1, 2]})
+
+    cache.put('first', df, {'row_count': 2})
+    cache.put('second', df, {'row_count': 2})
+
+    assert cache.get('first') is None
+    assert not (tmp_path / 'first.parquet').exists()
+    cached_df, metadata = cache.get('second')
+    pd.testing.assert_frame_equal(cached_df, df)
+    assert metadata == {'row_count': 2}
+
+
+def test_read_csv_detects_delimiter(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('id;name;score\n1;a;1.5\n2;b;\n')
+
+    df, metadata = FileUploadHandler().process_file(path)
+
+    assert list(df.columns) == ['id', 'name', 'score']
+    assert df['id'].tolist() == [1, 2]
+    assert pd.api.types.is_float_dtype(df['score'])
+    assert metadata['missing_values']['score'] == 1
+
+
+def test_read_csv_keeps_dates_as_text(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('day,at,n\n2024-01-01,2024-01-01T10:30:00,1\n2024-02-29,2024-01-02 00:00:00,2\n')
+
+    df, _ = FileUploadHandler().process_file(path)
+
+    assert df['day'].tolist() == ['2024-01-01', '2024-02-29']
+    assert df['at'].tolist() == ['2024-01-01T10:30:00', '2024-01-02 00:00:00']
+    assert df['n'].tolist() == [1, 2]
+
+
+def test_read_csv_reports_missing_text_like_pandas(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('name,city,val\na,,1\n,NA,\nc,Oslo,3\nnull,None,4\n')
+
+    df, metadata = FileUploadHandler().process_file(path)
+
+    assert metadata['missing_values'] == {'name': 2, 'city': 3, 'val': 1}
+    assert metadata['missing_values'] == pd.read_csv(path).isnull().sum().to_dict()
+    assert df['city'].iloc[2] == 'Oslo'
+
+
+def test_read_ods_first_sheet(tmp_path):
+    path = tmp_path / 'data.ods'
+    pd.DataFrame({'city': ['Oslo', 'Lima'], 'population': [709000, 10000000]}).to_excel(
+        path, engine='odf', index=False
+    )
+
+    df, _ = FileUploadHandler().process_file(path)
+
+    assert df['city'].tolist() == ['Oslo', 'Lima']
+    assert df['population'].tolist() == [709000, 10000000]
+
+
+def test_generate_metadata_basic_stats(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('x,label\n1,a\n2,b\n6,c\n')
+
+    _, metadata = FileUploadHandler().process_file(path)
+
+    assert metadata['basic_stats'] == {
+        'x': {'mean': 3.0, 'std': pd.Series([1, 2, 6]).std(), 'min': 1.0, 'max': 6.0, 'median': 2.0}
+    }
+
+
+def test_process_file_keeps_numeric_width_for_queries(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('a,b,price,label\n100000,300000,16777216.0,x\n' + '1,1,1.0,y\n' * 2)
+
+    df, _ = FileUploadHandler().process_file(path)
+    engine = KQLEngine(df)
+
+    assert df['a'].dtype == np.int64 and df['price'].dtype == np.float64
+    assert isinstance(df['label'].dtype, pd.StringDtype)
+    assert engine.execute_query('Data | extend c = a * b')['c'].iloc[0] == 30_000_000_000
+    assert engine.execute_query('Data | summarize s=sum(price)')['s'].iloc[0] == 16777218.0
+
+
+def test_read_csv_ignores_delimiters_inside_quotes(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('name|note\n"Smith, J"|"a, b, c"\n"Doe, A"|"d, e"\n')
+
+    df, _ = FileUploadHandler().process_file(path)
+
+    assert list(df.columns) == ['name', 'note']
+    assert df['name'].tolist() == ['Smith, J', 'Doe, A']
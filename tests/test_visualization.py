@@ -0,0 +1,295 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+
+from visualization import DataVisualizer, _fig_to_dict, dumps_json
+
+
+def _decode(values):
+    """Plotly's base64 typed-array encoding back to a NumPy array"""
+    if isinstance(values, dict):
+        array = np.frombuffer(base64.b64decode(values['bdata']), dtype=values['dtype'])
+        if 'shape' in values:
+            array = array.reshape([int(n) for n in values['shape'].split(',')])
+        return array
+    return np.asarray(values)
+
+
+@pytest.fixture
+def sales_df():
+    return pd.DataFrame({
+        'day': [1, 2, 3, 4, 5, 6],
+        'revenue': [100.0, 120.5, 90.0, 130.0, 150.0, 110.0],
+        'units': [10, 12, 9, 13, 15, 11],
+        'region': ['north', 'south', 'north', 'east', 'south', 'east']
+    })
+
+
+def test_figures_are_cached_until_dataframe_changes(sales_df):
+    visualizer = DataVisualizer(sales_df)
+
+    first = visualizer.create_histogram('revenue', output='bytes')
+    second = visualizer.create_histogram('revenue', output='bytes')
+    other = visualizer.create_histogram('revenue', nbins=3, output='bytes')
+
+    assert first is second
+    assert other is not first
+
+    visualizer.set_dataframe(sales_df.head(3))
+    assert visualizer.create_histogram('revenue', output='bytes') is not first
+
+
+def test_figure_dicts_are_not_shared_between_callers(sales_df):
+    visualizer = DataVisualizer(sales_df)
+
+    first = visualizer.create_histogram('revenue')
+    first['layout']['title'] = 'changed'
+
+    assert visualizer.create_histogram('revenue')['layout']['title'] != 'changed'
+    assert json.loads(visualizer.create_histogram('revenue', output='bytes'))['layout']['title'] != 'changed'
+
+
+def test_fig_to_dict_matches_json_round_trip():
+    df = pd.DataFrame({
+        'when': pd.date_range('2024-01-01', periods=4),
+        'value': [1.0, np.nan, 3.0, 4.0],
+        'label': ['a', None, 'b', 'a']
+    })
+    fig = px.scatter(df, x='when', y='value', hover_data=['label'])
+    expected = json.loads(fig.to_json())
+    # The object-typed customdata pushes plotly onto its fallback encoder, which pads dates with .000000
+    expected['data'][0]['x'] = [f'2024-01-0{day}T00:00:00' for day in range(1, 5)]
+
+    assert _fig_to_dict(fig) == expected
+
+
+def test_large_scatter_and_line_are_downsampled():
+    df = pd.DataFrame({'x': np.arange(1000), 'y': np.arange(1000) * 2.0})
+    visualizer = DataVisualizer(df)
+
+    scatter = visualizer.create_scatter_plot('x', 'y', max_points=100)
+    line = visualizer.create_line_plot('x', 'y', max_points=100)
+
+    assert len(DataVisualizer._sample_points(df, 100)) == 100
+    assert DataVisualizer._stride_points(df, 100)['x'].tolist() == list(range(0, 1000, 10))
+    assert len(_decode(scatter['data'][0]['x'])) == 100
+    assert len(_decode(line['data'][0]['x'])) == 100
+
+
+def test_scatter_hover_data_is_opt_in(sales_df):
+    visualizer = DataVisualizer(sales_df)
+
+    plain = visualizer.create_scatter_plot('day', 'revenue')
+    hovered = visualizer.create_scatter_plot('day', 'revenue', hover_data=['region'])
+
+    assert 'customdata' not in plain['data'][0]
+    assert [row[0] for row in hovered['data'][0]['customdata']] == sales_df['region'].tolist()
+
+
+def test_heatmap_matches_crosstab_and_pivot_table(sales_df):
+    visualizer = DataVisualizer(sales_df.assign(band=['lo', 'hi', 'lo', 'hi', 'hi', 'lo']))
+
+    counts = visualizer.create_heatmap('region', 'band')['data'][0]
+    means = visualizer.create_heatmap('region', 'band', values_column='revenue')['data'][0]
+
+    expected_counts = pd.crosstab(visualizer.df['band'], visualizer.df['region'])
+    expected_means = visualizer.df.pivot_table(index='band', columns='region', values='revenue',
+                                              aggfunc='mean', fill_value=0)
+    assert list(counts['x']) == expected_counts.columns.tolist()
+    assert list(counts['y']) == expected_counts.index.tolist()
+    np.testing.assert_array_equal(_decode(counts['z']), expected_counts.to_numpy())
+    np.testing.assert_allclose(_decode(means['z']), expected_means.to_numpy())
+
+
+def test_correlation_matrix_matches_pandas(sales_df):
+    z = _decode(DataVisualizer(sales_df).create_correlation_matrix()['data'][0]['z'])
+
+    np.testing.assert_allclose(z, sales_df[['day', 'revenue', 'units']].corr().to_numpy())
+
+
+def test_correlation_is_computed_once_per_frame(sales_df):
+    visualizer = DataVisualizer(sales_df)
+
+    visualizer.create_correlation_matrix()
+    corr = visualizer._correlation()
+    visualizer.create_correlation_matrix(title='Again')
+
+    assert visualizer._correlation() is corr
+    visualizer.set_dataframe(sales_df[['day', 'units']])
+    assert list(visualizer._correlation().columns) == ['day', 'units']
+
+
+def test_line_plot_sorts_only_unordered_x(sales_df):
+    visualizer = DataVisualizer(sales_df.iloc[::-1])
+
+    ordered = DataVisualizer(sales_df)._sorted_by('day', 'revenue')
+    line = visualizer.create_line_plot('day', 'revenue')
+
+    assert list(ordered.columns) == ['day', 'revenue']
+    assert np.shares_memory(ordered['day'].to_numpy(), sales_df['day'].to_numpy())
+    assert _decode(line['data'][0]['x']).tolist() == [1, 2, 3, 4, 5, 6]
+
+
+def test_plots_receive_only_their_columns(sales_df, monkeypatch):
+    received = []
+    original = px.bar
+
+    def spy(data_frame, **kwargs):
+        received.append(list(data_frame.columns))
+        return original(data_frame, **kwargs)
+
+    monkeypatch.setattr(px, 'bar', spy)
+    DataVisualizer(sales_df).create_bar_chart('region', 'revenue', color_column='region')
+
+    assert received == [['region', 'revenue']]
+
+
+def test_dashboard_traces_use_arrays(sales_df):
+    visualizer = DataVisualizer(sales_df)
+
+    trace = visualizer._create_scatter_trace({'x_column': 'day', 'y_column': 'revenue'})
+
+    assert _decode(trace.to_plotly_json()['y']).tolist() == sales_df['revenue'].tolist()
+    assert list(visualizer._create_bar_trace({'x_column': 'region', 'y_column': 'units'}).x) == sales_df['region'].tolist()
+
+
+def test_dashboard_places_traces_in_grid_order(sales_df):
+    dashboard = DataVisualizer(sales_df).create_dashboard({
+        'rows': 1,
+        'cols': 3,
+        'plots': [
+            {'type': 'histogram', 'column': 'revenue', 'title': 'Revenue'},
+            {'type': 'unknown'},
+            {'type': 'line', 'x_column': 'day', 'y_column': 'units'}
+        ]
+    })
+
+    assert [trace['type'] for trace in dashboard['data']] == ['histogram', 'scatter']
+    assert [trace['xaxis'] for trace in dashboard['data']] == ['x', 'x3']
+    assert dashboard['layout']['annotations'][0]['text'] == 'Revenue'
+
+
+def test_available_visualizations_are_shared_constants(sales_df):
+    available = DataVisualizer(sales_df).get_available_visualizations()
+
+    assert [v['type'] for v in available][:2] == ['histogram', 'scatter']
+    assert available[0] is DataVisualizer(sales_df.head(1)).get_available_visualizations()[0]
+
+
+def test_missing_columns_are_reported_together(sales_df):
+    visualizer = DataVisualizer(sales_df)
+
+    with pytest.raises(ValueError, match="Column 'nope' not found"):
+        visualizer.create_histogram('nope')
+    with pytest.raises(ValueError, match='Columns not found: a, b'):
+        visualizer.create_scatter_plot('a', 'b')
+    with pytest.raises(ValueError, match="Column 'shade' not found"):
+        visualizer.create_bar_chart('region', 'units', color_column='shade')
+
+
+def test_histogram_requires_numeric_column(sales_df):
+    visualizer = DataVisualizer(sales_df)
+
+    assert visualizer._numeric_cols == {'day', 'revenue', 'units'}
+    with pytest.raises(ValueError, match='must be numeric'):
+        visualizer.create_histogram('region')
+    assert visualizer._create_histogram_trace({'column': 'region'}) is None
+
+
+def test_dumps_json_round_trips_figures(sales_df):
+    figure = DataVisualizer(sales_df).create_box_plot('region', 'revenue')
+
+    assert json.loads(dumps_json(figure)) == figure
+
+
+def test_heatmap_groups_low_cardinality_labels_as_categoricals():
+    df = pd.DataFrame({'x': ['a', 'b'] * 50, 'y': ['u', 'v', 'w', 'u'] * 25, 'id': range(100)})
+    visualizer = DataVisualizer(df)
+
+    heatmap = visualizer.create_heatmap('x', 'y')['data'][0]
+
+    assert isinstance(visualizer._categoricals['x'].dtype, pd.CategoricalDtype)
+    assert list(heatmap['x']) == ['a', 'b'] and list(heatmap['y']) == ['u', 'v', 'w']
+    np.testing.assert_array_equal(_decode(heatmap['z']), pd.crosstab(df['y'], df['x']).to_numpy())
+    assert not isinstance(visualizer._maybe_categorical('id').dtype, pd.CategoricalDtype)
+
+
+def test_bytes_output_is_serialized_figure(sales_df):
+    visualizer = DataVisualizer(sales_df)
+
+    payload = visualizer.create_bar_chart('region', 'revenue', output='bytes')
+
+    assert isinstance(payload, bytes)
+    assert json.loads(payload) == visualizer.create_bar_chart('region', 'revenue')
+    assert visualizer.create_bar_chart('region', 'revenue', output='bytes') is payload
+
+
+def test_large_histogram_is_binned_server_side(monkeypatch):
+    monkeypatch.setattr('visualization.MAX_PLOT_POINTS', 100)
+    values = np.arange(1000, dtype=float)
+
+    figure = DataVisualizer(pd.DataFrame({'v': values})).create_histogram('v', nbins=10)
+    box, bars = figure['data']
+
+    assert bars['type'] == 'bar' and box['type'] == 'box'
+    np.testing.assert_array_equal(_decode(bars['y']), np.full(10, 100))
+    np.testing.assert_allclose(_decode(bars['x']), np.arange(49.95, 1000, 99.9))
+    assert _decode(box['median']).tolist() == [499.5]
+    assert 'x' not in box
+
+
+def test_plot_arrays_are_downcast_only_when_invisible():
+    df = pd.DataFrame({
+        'x': np.linspace(0, 1, 50),
+        'epoch': 1.7e9 + np.arange(50, dtype=float),
+        'n': np.arange(50, dtype=np.int64)
+    })
+    visualizer = DataVisualizer(df)
+
+    scatter = visualizer.create_scatter_plot('x', 'epoch')['data'][0]
+    bar = visualizer._create_bar_trace({'x_column': 'n', 'y_column': 'x'})
+
+    assert scatter['x']['dtype'] == 'f4' and scatter['y']['dtype'] == 'f8'
+    np.testing.assert_allclose(_decode(scatter['x']), df['x'], rtol=1e-6)
+    assert bar.x.dtype == np.int32 and bar.y.dtype == np.float32
+    assert df['x'].dtype == np.float64
+
+
+def test_box_plot_drops_inner_points_on_large_frames(sales_df, monkeypatch):
+    assert DataVisualizer(sales_df).create_box_plot('region', 'revenue')['data'][0]['boxpoints'] == 'all'
+
+    monkeypatch.setattr('visualization.BOX_POINTS_MAX_ROWS', 2)
+
+    assert DataVisualizer(sales_df).create_box_plot('region', 'revenue')['data'][0]['boxpoints'] == 'outliers'
+
+
+def test_sorted_by_matches_stable_sort_values():
+    df = pd.DataFrame({
+        'x': [3.0, 1.0, np.nan, 1.0, 2.0],
+        'when': pd.to_datetime(['2024-03-01', None, '2024-01-01', '2024-02-01', '2024-01-01']),
+        'label': ['c', 'a', None, 'a', 'b'],
+        'y': range(5),
+        'unused': range(5)
+    })
+    visualizer = DataVisualizer(df)
+
+    for key in ('x', 'when', 'label'):
+        expected = df[[key, 'y']].sort_values(by=key, kind='stable')
+        pd.testing.assert_frame_equal(visualizer._sorted_by(key, 'y'), expected)
+
+
+def test_datetime_axes_match_plotly_encoder():
+    pytest.importorskip('orjson')
+    df = pd.DataFrame({
+        'when': pd.date_range('2024-01-01', periods=4, freq='90min', tz='Europe/Oslo'),
+        'at': pd.to_datetime(['2024-01-01 00:00:00', '2024-01-01 00:00:00.250', '2024-01-01 12:00', '2024-01-02'], format='ISO8601'),
+        'y': [1.0, 2.0, 3.0, 4.0]
+    })
+
+    for column in ('when', 'at'):
+        fig = px.scatter(df, x=column, y='y')
+        assert _fig_to_dict(fig)['data'][0]['x'] == json.loads(fig.to_json(engine='orjson'))['data'][0]['x']
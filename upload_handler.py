@@ -1,14 +1,101 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import hashlib
+import os
 import tempfile
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
 import json
+import csv
+import pyarrow.csv as pv
 import pyarrow.parquet as pq
 import pyarrow as pa
-from odf import opendocument, teletype
-from odf.table import Table, TableRow, TableCell
-from odf.text import P
+
+CSV_SNIFF_BYTES = 8192
+# pandas.read_csv's default NA strings, so Arrow-parsed CSVs report the same missing cells
+CSV_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                 '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+def save_stream(stream, file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Write a stream to disk in chunks, returning the SHA-256 of its content.
+    
+    The content lands in a temp file renamed into place, so a failed stream leaves nothing behind.
+    """
+    file_path = Path(file_path)
+    digest = hashlib.sha256()
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f'.{file_path.name}.', suffix='.part')
+    try:
+        with open(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+        Path(tmp_name).replace(file_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return digest.hexdigest()
+
+class ParsedUploadCache:
+    """Parsed frames of recent uploads, stored as Parquet and keyed by content digest"""
+    
+    def __init__(self, cache_dir: Path, max_entries: int = 16):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # The index lives in memory only, so files left by a previous process can never be hit
+        for stale in [*self.cache_dir.glob('*.parquet'), *self.cache_dir.glob('.*.part')]:
+            stale.unlink(missing_ok=True)
+    
+    def get(self, digest: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            self._entries.move_to_end(digest)
+        
+        parquet_path, metadata = entry
+        try:
+            return pd.read_parquet(parquet_path), dict(metadata)
+        except FileNotFoundError:
+            # Evicted by a concurrent put (or removed from disk) between the lookup and the read
+            with self._lock:
+                if self._entries.get(digest) is entry:
+                    del self._entries[digest]
+            return None
+    
+    def put(self, digest: str, df: pd.DataFrame, metadata: Dict[str, Any]):
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                return
+        
+        # Written under a unique name and renamed in under the lock, so concurrent puts never share a file
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        parquet_path = self.cache_dir / f'{digest}.parquet'
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=f'.{digest}.', suffix='.part')
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_name, compression='zstd')
+        except Exception:
+            # Frames pyarrow can't represent are simply not cached
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        
+        with self._lock:
+            Path(tmp_name).replace(parquet_path)
+            self._entries[digest] = (parquet_path, metadata)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                _, (old_path, _) = self._entries.popitem(last=False)
+                if old_path.exists():
+                    old_path.unlink()
 
 class FileUploadHandler:
     
@@ -39,21 +126,30 @@ class FileUploadHandler:
         return df, metadata
     
     def _read_csv(self, file_path: Path) -> pd.DataFrame:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            first_line = f.readline()
-        
-        delimiters = [',', ';', '\t', '|']
-        detected_delimiter = ','
-        max_count = 0
+        # Sniff the delimiter from a bounded prefix, cut at a line end so no row is partial
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            sample = f.read(CSV_SNIFF_BYTES)
+        if '\n' in sample:
+            sample = sample[:sample.rindex('\n')]
         
-        for delim in delimiters:
-            count = first_line.count(delim)
-            if count > max_count:
-                max_count = count
-                detected_delimiter = delim
+        try:
+            detected_delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+        except csv.Error:
+            detected_delimiter = ','
         
-        return pd.read_csv(file_path, delimiter=detected_delimiter, 
-                          encoding='utf-8', engine='python')
+        try:
+            parse_options = pv.ParseOptions(delimiter=detected_delimiter)
+            # Arrow would infer date32/timestamp columns; keep them as text like the pandas reader does
+            convert_options = pv.ConvertOptions(null_values=CSV_NA_VALUES, strings_can_be_null=True)
+            with pv.open_csv(file_path, parse_options=parse_options, convert_options=convert_options) as reader:
+                as_text = {field.name: pa.string() for field in reader.schema if pa.types.is_temporal(field.type)}
+            convert_options.column_types = as_text
+            table = pv.read_csv(file_path, parse_options=parse_options, convert_options=convert_options)
+            return table.to_pandas()
+        except pa.ArrowInvalid:
+            # Ragged rows or mixed encodings that Arrow rejects still go through the C parser
+            return pd.read_csv(file_path, delimiter=detected_delimiter,
+                              encoding='utf-8', engine='c')
     
     def _read_excel(self, file_path: Path) -> pd.DataFrame:
         try:
@@ -74,36 +170,13 @@ class FileUploadHandler:
     
     def _read_ods(self, file_path: Path) -> pd.DataFrame:
         try:
-            doc = opendocument.load(file_path)
-            
-            tables = doc.getElementsByType(Table)
-            if not tables:
-                raise ValueError("No tables found in ODS file")
-            
-            table = tables[0]
-            rows = table.getElementsByType(TableRow)
-            
-            data = []
-            for row in rows:
-                row_data = []
-                cells = row.getElementsByType(TableCell)
-                for cell in cells:
-                    text_elements = cell.getElementsByType(P)
-                    cell_text = ''
-                    for elem in text_elements:
-                        cell_text += teletype.extractText(elem)
-                    row_data.append(cell_text)
-                data.append(row_data)
-            
-            # Convert to Data
-            df = pd.DataFrame(data[1:], columns=data[0] if data else [])
-            return df
-            
+            # Cells come back typed rather than as concatenated paragraph text
+            return pd.read_excel(file_path, engine='odf', sheet_name=0)
         except Exception as e:
             raise ValueError(f"Error reading ODS file: {str(e)}")
     
     def _read_parquet(self, file_path: Path) -> pd.DataFrame:
-        return pd.read_parquet(file_path)
+        return pq.read_table(file_path, use_threads=True).to_pandas()
     
     def _read_json(self, file_path: Path) -> pd.DataFrame:
         with open(file_path, 'r') as f:
@@ -129,19 +202,16 @@ class FileUploadHandler:
             'column_count': len(df.columns),
             'columns': list(df.columns),
             'data_types': {col: str(dtype) for col, dtype in df.dtypes.items()},
-            'missing_values': df.isnull().sum().to_dict(),
-            'memory_usage': df.memory_usage(deep=True).sum(),
+            'missing_values': {col: int(n) for col, n in df.isnull().sum().items()},
+            # Shallow sizing; deep=True would rescan every string object
+            'memory_usage': int(df.memory_usage(deep=False).sum()),
             'basic_stats': {}
         }
         
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            metadata['basic_stats'][col] = {
-                'mean': float(df[col].mean()),
-                'std': float(df[col].std()),
-                'min': float(df[col].min()),
-                'max': float(df[col].max()),
-                'median': float(df[col].median())
-            }
+        if len(numeric_cols) > 0:
+            stats = df[numeric_cols].describe(percentiles=[0.5]).T
+            stats = stats[['mean', 'std', 'min', 'max', '50%']].rename(columns={'50%': 'median'})
+            metadata['basic_stats'] = stats.astype(float).to_dict(orient='index')
         
         return metadata
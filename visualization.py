@@ -1,30 +1,268 @@
-from matplotlib.pyplot import plot
 import plotly.graph_objects as go
 import plotly.express as px
 import plotly.subplots as sp
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 import json
 from plotly.utils import PlotlyJSONEncoder
+from collections import OrderedDict
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FIGURE_CACHE_SIZE = 32
+MAX_PLOT_POINTS = 50_000
+CATEGORICAL_MAX_RATIO = 0.5  # unique/rows ratio below which label columns are grouped as categoricals
+PLOT_PRECISION = 1e-5  # float32 rounding must stay below this fraction of the plotted span
+INT32 = np.iinfo(np.int32)
+FLOAT32 = np.finfo(np.float32)
+BOX_POINTS_MAX_ROWS = 5_000  # above this, box plots draw only outliers instead of every point
+
+# Static catalogue served by /visualize/available; shared, so treat the entries as read-only
+AVAILABLE_VISUALIZATIONS = (
+    {
+        'type': 'histogram',
+        'name': 'Histogram',
+        'description': 'Distribution of a numeric variable',
+        'required_columns': 1,
+        'column_types': ['numeric']
+    },
+    {
+        'type': 'scatter',
+        'name': 'Scatter Plot',
+        'description': 'Relationship between two numeric variables',
+        'required_columns': 2,
+        'column_types': ['numeric', 'numeric']
+    },
+    {
+        'type': 'line',
+        'name': 'Line Plot',
+        'description': 'Trend over time or ordered categories',
+        'required_columns': 2,
+        'column_types': ['any', 'numeric']
+    },
+    {
+        'type': 'bar',
+        'name': 'Bar Chart',
+        'description': 'Comparison across categories',
+        'required_columns': 2,
+        'column_types': ['any', 'numeric']
+    },
+    {
+        'type': 'box',
+        'name': 'Box Plot',
+        'description': 'Distribution comparison across categories',
+        'required_columns': 2,
+        'column_types': ['any', 'numeric']
+    },
+    {
+        'type': 'heatmap',
+        'name': 'Heatmap',
+        'description': 'Matrix visualization of relationships',
+        'required_columns': 2,
+        'column_types': ['any', 'any']
+    },
+    {
+        'type': 'correlation',
+        'name': 'Correlation Matrix',
+        'description': 'Correlations between all numeric variables',
+        'required_columns': 2,
+        'column_types': ['numeric']
+    },
+    {
+        'type': 'pie',
+        'name': 'Pie Chart',
+        'description': 'Proportional composition',
+        'required_columns': 2,
+        'column_types': ['any', 'numeric']
+    }
+)
+
+def _json_leaf(value):
+    """JSON-ready form of a value to_plotly_json leaves as a NumPy/pandas object"""
+    if isinstance(value, (pd.Series, pd.Index)):
+        value = value.to_numpy()
+    
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'M':
+            # Like datetime.isoformat(), which PlotlyJSONEncoder uses: microseconds only when non-zero
+            seconds = value.astype('datetime64[s]')
+            text = np.where(seconds == value, np.datetime_as_string(seconds), np.datetime_as_string(value, unit='us'))
+            return np.where(np.isnat(value), None, text).tolist()
+        if value.dtype.kind == 'O':
+            return [_json_leaf(item) for item in value.tolist()]
+        if value.dtype.kind == 'f' and np.isnan(value).any():
+            return np.where(np.isnan(value), None, value).tolist()
+        return value.tolist()
+    
+    if isinstance(value, list):
+        return [_json_leaf(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    if value is pd.NaT:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+def _fig_to_dict(fig) -> Dict[str, Any]:
+    """fig.to_plotly_json() with leftover arrays and scalars converted, skipping a JSON text round-trip"""
+    root = fig.to_plotly_json()
+    stack = [root]
+    
+    while stack:
+        node = stack.pop()
+        for key, value in (node.items() if isinstance(node, dict) else enumerate(node)):
+            if isinstance(value, tuple):
+                value = node[key] = list(value)
+            if isinstance(value, dict) or (isinstance(value, list) and any(isinstance(v, (dict, list, tuple)) for v in value)):
+                stack.append(value)
+            elif isinstance(value, (str, int, bool)) or value is None:
+                continue
+            else:
+                node[key] = _json_leaf(value)
+    
+    return root
+
+def _downcast_for_plot(values: np.ndarray) -> np.ndarray:
+    """float64/int64 values as float32/int32 when the narrowing is invisible at plot resolution"""
+    if values.dtype == np.int64 and len(values):
+        if INT32.min <= values.min() and values.max() <= INT32.max:
+            return values.astype(np.int32)
+    elif values.dtype == np.float64:
+        finite = values[np.isfinite(values)]
+        if len(finite):
+            lo, hi = finite.min(), finite.max()
+            magnitude = max(abs(lo), abs(hi))
+            if magnitude < FLOAT32.max and magnitude * FLOAT32.eps <= (hi - lo) * PLOT_PRECISION:
+                return values.astype(np.float32)
+    return values
+
+def _downcast_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """The frame with its numeric columns passed through _downcast_for_plot"""
+    narrowed = {}
+    for col, dtype in df.dtypes.items():
+        if dtype in (np.float64, np.int64):
+            values = _downcast_for_plot(df[col].to_numpy())
+            if values.dtype != dtype:
+                narrowed[col] = values
+    return df.assign(**narrowed) if narrowed else df
+
+def dumps_json(obj) -> bytes:
+    """UTF-8 JSON for an API response, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, cls=PlotlyJSONEncoder).encode('utf-8')
+
+def cached_figure(method):
+    """Memoize a figure builder's JSON bytes on its arguments until the visualizer's frame changes.
+    
+    output='bytes' returns the cached, response-ready JSON; the default dict output is built fresh
+    on every call, so callers own (and may mutate) what they get.
+    """
+    @wraps(method)
+    def wrapper(self, *args, output: str = 'dict', **kwargs):
+        if output != 'bytes':
+            return method(self, *args, **kwargs)
+        
+        key = json.dumps([method.__name__, args, kwargs], sort_keys=True, default=str)
+        with self._figure_lock:
+            cached = self._figure_cache.get(key)
+            if cached is not None:
+                self._figure_cache.move_to_end(key)
+                return cached
+        
+        payload = dumps_json(method(self, *args, **kwargs))
+        with self._figure_lock:
+            self._figure_cache[key] = payload
+            if len(self._figure_cache) > FIGURE_CACHE_SIZE:
+                self._figure_cache.popitem(last=False)
+        return payload
+    return wrapper
 
 class DataVisualizer:
     
     def __init__(self, df: pd.DataFrame):
+        self._figure_cache = OrderedDict()
+        # Flask serves requests on several threads, all sharing a session's visualizer
+        self._figure_lock = threading.Lock()
+        self.set_dataframe(df)
+    
+    def set_dataframe(self, df: pd.DataFrame):
         self.df = df
+        self._cols = frozenset(df.columns)
+        # Same rule as pd.api.types.is_numeric_dtype, resolved once per frame
+        self._numeric_cols = frozenset(
+            col for col, dtype in df.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)
+        )
+        with self._figure_lock:
+            self._figure_cache.clear()
+        self._corr = None
+        self._categoricals = {}
+    
+    def _require(self, *columns: str):
+        """Raise one ValueError naming every given column the frame lacks"""
+        missing = [c for c in columns if c and c not in self._cols]
+        if len(missing) == 1:
+            raise ValueError(f"Column '{missing[0]}' not found")
+        if missing:
+            raise ValueError(f"Columns not found: {', '.join(map(str, missing))}")
     
+    def _maybe_categorical(self, column: str) -> pd.Series:
+        """Low-cardinality text column as a cached categorical, so grouping hashes codes not strings"""
+        if column not in self._categoricals:
+            series = self.df[column]
+            if (series.dtype == object or pd.api.types.is_string_dtype(series)) and len(series):
+                try:
+                    if series.nunique() / len(series) < CATEGORICAL_MAX_RATIO:
+                        series = series.astype('category')
+                except TypeError:
+                    pass
+            self._categoricals[column] = series
+        return self._categoricals[column]
+    
+    def _correlation(self) -> pd.DataFrame:
+        """Pearson matrix of the numeric columns, computed once per frame"""
+        if self._corr is None:
+            numeric_df = self.df.select_dtypes(include=[np.number])
+            
+            # NaN-free data (the common case) needs one corrcoef pass instead of pairwise corr()
+            values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+            if np.isnan(values).any():
+                self._corr = numeric_df.corr()
+            else:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    corr = np.corrcoef(values, rowvar=False)
+                self._corr = pd.DataFrame(corr, index=numeric_df.columns, columns=numeric_df.columns)
+        return self._corr
+    
+    @cached_figure
     def create_histogram(self, column: str, 
                         title: str = None,
                         color: str = None,
                         nbins: int = None) -> Dict[str, Any]:
-        if column not in self.df.columns:
-            raise ValueError(f"Column '{column}' not found")
+        self._require(column, color)
         
-        if not pd.api.types.is_numeric_dtype(self.df[column]):
+        if column not in self._numeric_cols:
             raise ValueError(f"Column '{column}' must be numeric")
         
+        if color is None and len(self.df) > MAX_PLOT_POINTS:
+            values = self.df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            if len(values):
+                return _fig_to_dict(self._binned_histogram(values, column, title or f'Histogram of {column}', nbins))
+        
         fig = px.histogram(
-            self.df,
+            _downcast_frame(self._project(column, color)),
             x=column,
             title=title or f'Histogram of {column}',
             color=color,
@@ -32,42 +270,67 @@ class DataVisualizer:
             marginal='box'
         )
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
+    
+    @staticmethod
+    def _binned_histogram(values: np.ndarray, column: str, title: str, nbins: int = None) -> go.Figure:
+        """Histogram binned server-side with a precomputed box marginal, so no raw points are shipped"""
+        counts, edges = np.histogram(values, bins=nbins or 'auto')
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        
+        fig = sp.make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.03)
+        fig.add_trace(go.Box(
+            q1=[q1], median=[median], q3=[q3],
+            lowerfence=[inside.min()], upperfence=[inside.max()],
+            orientation='h', name=column, showlegend=False
+        ), row=1, col=1)
+        fig.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name=column, showlegend=False
+        ), row=2, col=1)
+        fig.update_layout(title_text=title, bargap=0)
+        fig.update_yaxes(showticklabels=False, row=1, col=1)
+        fig.update_xaxes(title_text=column, row=2, col=1)
+        fig.update_yaxes(title_text='count', row=2, col=1)
+        return fig
     
+    @cached_figure
     def create_scatter_plot(self, x_column: str, y_column: str,
                           color_column: str = None,
                           size_column: str = None,
-                          title: str = None) -> Dict[str, Any]:
-        if x_column not in self.df.columns:
-            raise ValueError(f"Column '{x_column}' not found")
-        if y_column not in self.df.columns:
-            raise ValueError(f"Column '{y_column}' not found")
+                          title: str = None,
+                          max_points: int = None,
+                          hover_data: Optional[List[str]] = None) -> Dict[str, Any]:
+        # hover_data is opt-in: every hover column is shipped once per point
+        self._require(x_column, y_column, color_column, size_column)
         
         fig = px.scatter(
-            self.df,
+            _downcast_frame(self._sample_points(
+                self._project(x_column, y_column, color_column, size_column, *(hover_data or [])), max_points
+            )),
             x=x_column,
             y=y_column,
             color=color_column,
             size=size_column,
             title=title or f'{y_column} vs {x_column}',
-            hover_data=self.df.columns.tolist()
+            hover_data=hover_data
         )
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
     
+    @cached_figure
     def create_line_plot(self, x_column: str, y_column: str,
                         color_column: str = None,
-                        title: str = None) -> Dict[str, Any]:
-        if x_column not in self.df.columns:
-            raise ValueError(f"Column '{x_column}' not found")
-        if y_column not in self.df.columns:
-            raise ValueError(f"Column '{y_column}' not found")
+                        title: str = None,
+                        max_points: int = None) -> Dict[str, Any]:
+        self._require(x_column, y_column, color_column)
         
         # Sort by x_column if it's datetime or numeric
-        df_sorted = self.df.sort_values(by=x_column)
+        df_sorted = self._stride_points(self._sorted_by(x_column, y_column, color_column), max_points)
         
         fig = px.line(
-            df_sorted,
+            _downcast_frame(df_sorted),
             x=x_column,
             y=y_column,
             color=color_column,
@@ -75,20 +338,18 @@ class DataVisualizer:
             markers=True
         )
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
     
+    @cached_figure
     def create_bar_chart(self, x_column: str, y_column: str,
                         color_column: str = None,
                         title: str = None,
                         orientation: str = 'v') -> Dict[str, Any]:
-        if x_column not in self.df.columns:
-            raise ValueError(f"Column '{x_column}' not found")
-        if y_column not in self.df.columns:
-            raise ValueError(f"Column '{y_column}' not found")
+        self._require(x_column, y_column, color_column)
         
         if orientation == 'v':
             fig = px.bar(
-                self.df,
+                _downcast_frame(self._project(x_column, y_column, color_column)),
                 x=x_column,
                 y=y_column,
                 color=color_column,
@@ -96,7 +357,7 @@ class DataVisualizer:
             )
         else:
             fig = px.bar(
-                self.df,
+                _downcast_frame(self._project(x_column, y_column, color_column)),
                 y=x_column,
                 x=y_column,
                 color=color_column,
@@ -104,49 +365,42 @@ class DataVisualizer:
                 orientation='h'
             )
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
     
+    @cached_figure
     def create_box_plot(self, x_column: str, y_column: str,
                        color_column: str = None,
                        title: str = None) -> Dict[str, Any]:
-        if x_column not in self.df.columns:
-            raise ValueError(f"Column '{x_column}' not found")
-        if y_column not in self.df.columns:
-            raise ValueError(f"Column '{y_column}' not found")
+        self._require(x_column, y_column, color_column)
         
         fig = px.box(
-            self.df,
+            self._project(x_column, y_column, color_column),
             x=x_column,
             y=y_column,
             color=color_column,
             title=title or f'Box Plot of {y_column} by {x_column}',
-            points='all'
+            points='all' if len(self.df) <= BOX_POINTS_MAX_ROWS else 'outliers'
         )
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
     
+    @cached_figure
     def create_heatmap(self, x_column: str, y_column: str,
                       values_column: str = None,
                       title: str = None) -> Dict[str, Any]:
-        if x_column not in self.df.columns:
-            raise ValueError(f"Column '{x_column}' not found")
-        if y_column not in self.df.columns:
-            raise ValueError(f"Column '{y_column}' not found")
+        self._require(x_column, y_column)
         
+        keys = [self._maybe_categorical(y_column), self._maybe_categorical(x_column)]
         if values_column:
-            if values_column not in self.df.columns:
-                raise ValueError(f"Column '{values_column}' not found")
+            self._require(values_column)
             
-            pivot_data = self.df.pivot_table(
-                index=y_column,
-                columns=x_column,
-                values=values_column,
-                aggfunc='mean',
-                fill_value=0
-            )
+            grouped = self.df[values_column].groupby(keys, observed=True, sort=False).mean()
         else:
             # count heatmap
-            pivot_data = pd.crosstab(self.df[y_column], self.df[x_column])
+            grouped = self.df.groupby(keys, observed=True, sort=False).size()
+        
+        # One hash-group pass; only the small pivoted grid gets sorted
+        pivot_data = grouped.unstack(fill_value=0).sort_index().sort_index(axis=1)
         
         fig = px.imshow(
             pivot_data,
@@ -155,15 +409,14 @@ class DataVisualizer:
             color_continuous_scale='Viridis'
         )
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
     
+    @cached_figure
     def create_correlation_matrix(self, title: str = None) -> Dict[str, Any]:
-        numeric_df = self.df.select_dtypes(include=[np.number])
-        
-        if len(numeric_df.columns) < 2:
+        if len(self._correlation().columns) < 2:
             raise ValueError("Need at least 2 numeric columns for correlation matrix")
         
-        corr_matrix = numeric_df.corr()
+        corr_matrix = self._correlation()
         
         fig = px.imshow(
             corr_matrix,
@@ -174,25 +427,24 @@ class DataVisualizer:
             text_auto='.2f'
         )
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
     
+    @cached_figure
     def create_pie_chart(self, names_column: str, values_column: str,
                         title: str = None) -> Dict[str, Any]:
-        if names_column not in self.df.columns:
-            raise ValueError(f"Column '{names_column}' not found")
-        if values_column not in self.df.columns:
-            raise ValueError(f"Column '{values_column}' not found")
+        self._require(names_column, values_column)
         
         fig = px.pie(
-            self.df,
+            self._project(names_column, values_column),
             names=names_column,
             values=values_column,
             title=title or f'Distribution of {values_column} by {names_column}',
             hole=0.3
         )
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
     
+    @cached_figure
     def create_dashboard(self, config: Dict[str, Any]) -> Dict[str, Any]:
         
         rows = config.get('rows', 2)
@@ -202,50 +454,45 @@ class DataVisualizer:
         fig = sp.make_subplots(
             rows=rows,
             cols=cols,
-            subplot_titles=[plot.get('title', f'Plot {i+1}') for i in range(len(plots))]
+            subplot_titles=[plot_config.get('title', f'Plot {i+1}') for i, plot_config in enumerate(plots)]
         )
         
-        plot_index = 0
-        for row in range(1, rows + 1):
-            for col in range(1, cols + 1):
-                if plot_index < len(plots):
-                    plot_config = plots[plot_index]
-                    plot_type = plot_config.get('type')
-                    
-                    if plot_type == 'histogram':
-                        trace = self._create_histogram_trace(plot_config)
-                    elif plot_type == 'scatter':
-                        trace = self._create_scatter_trace(plot_config)
-                    elif plot_type == 'line':
-                        trace = self._create_line_trace(plot_config)
-                    elif plot_type == 'bar':
-                        trace = self._create_bar_trace(plot_config)
-                    else:
-                        trace = None
-                    
-                    if trace:
-                        fig.add_trace(trace, row=row, col=col)
-                    
-                    plot_index += 1
+        cells = [(row, col) for row in range(1, rows + 1) for col in range(1, cols + 1)]
+        placed = list(zip(cells, plots))
+        
+        # Traces only read self.df, so they are built concurrently; the figure is mutated on this thread
+        if placed:
+            with ThreadPoolExecutor(max_workers=min(len(placed), os.cpu_count() or 1)) as pool:
+                traces = list(pool.map(self._create_trace, [plot_config for _, plot_config in placed]))
+            
+            for ((row, col), _), trace in zip(placed, traces):
+                if trace:
+                    fig.add_trace(trace, row=row, col=col)
         
         fig.update_layout(height=800, title_text=config.get('title', 'Dashboard'))
         
-        return json.loads(fig.to_json())
+        return _fig_to_dict(fig)
     
+    def _create_trace(self, plot_config: Dict[str, Any]):
+        builder = self._TRACE_BUILDERS.get(plot_config.get('type'))
+        return builder(self, plot_config) if builder else None
+    
+    # Traces take plain ndarrays so Plotly validates one buffer instead of iterating a Series
     def _create_histogram_trace(self, config: Dict[str, Any]) -> go.Histogram:
         column = config.get('column')
-        if column in self.df.columns and pd.api.types.is_numeric_dtype(self.df[column]):
-            return go.Histogram(x=self.df[column], name=config.get('name', column))
+        if column in self._numeric_cols:
+            return go.Histogram(x=_downcast_for_plot(self.df[column].to_numpy()), name=config.get('name', column))
         return None
     
     def _create_scatter_trace(self, config: Dict[str, Any]) -> go.Scatter:
         x_col = config.get('x_column')
         y_col = config.get('y_column')
         
-        if x_col in self.df.columns and y_col in self.df.columns:
+        if x_col in self._cols and y_col in self._cols:
+            df_sampled = self._sample_points(self._project(x_col, y_col), config.get('max_points'))
             return go.Scatter(
-                x=self.df[x_col],
-                y=self.df[y_col],
+                x=_downcast_for_plot(df_sampled[x_col].to_numpy()),
+                y=_downcast_for_plot(df_sampled[y_col].to_numpy()),
                 mode='markers',
                 name=config.get('name', f'{y_col} vs {x_col}')
             )
@@ -255,11 +502,11 @@ class DataVisualizer:
         x_col = config.get('x_column')
         y_col = config.get('y_column')
         
-        if x_col in self.df.columns and y_col in self.df.columns:
-            df_sorted = self.df.sort_values(by=x_col)
+        if x_col in self._cols and y_col in self._cols:
+            df_sorted = self._stride_points(self._sorted_by(x_col, y_col), config.get('max_points'))
             return go.Scatter(
-                x=df_sorted[x_col],
-                y=df_sorted[y_col],
+                x=_downcast_for_plot(df_sorted[x_col].to_numpy()),
+                y=_downcast_for_plot(df_sorted[y_col].to_numpy()),
                 mode='lines+markers',
                 name=config.get('name', f'{y_col} over {x_col}')
             )
@@ -269,72 +516,53 @@ class DataVisualizer:
         x_col = config.get('x_column')
         y_col = config.get('y_column')
         
-        if x_col in self.df.columns and y_col in self.df.columns:
+        if x_col in self._cols and y_col in self._cols:
             return go.Bar(
-                x=self.df[x_col],
-                y=self.df[y_col],
+                x=_downcast_for_plot(self.df[x_col].to_numpy()),
+                y=_downcast_for_plot(self.df[y_col].to_numpy()),
                 name=config.get('name', f'{y_col} by {x_col}')
             )
         return None
     
+    # Dashboard plot type -> trace builder
+    _TRACE_BUILDERS: Dict[str, Callable] = {
+        'histogram': _create_histogram_trace,
+        'scatter': _create_scatter_trace,
+        'line': _create_line_trace,
+        'bar': _create_bar_trace
+    }
+    
+    def _project(self, *columns: str) -> pd.DataFrame:
+        """Only the named columns, so Plotly Express never walks the rest of the frame"""
+        return self.df[[c for c in dict.fromkeys(columns) if c and c in self._cols]]
+    
+    def _sorted_by(self, x_column: str, *columns: str) -> pd.DataFrame:
+        """The plotted columns ordered by x, skipping the sort when x is already ascending"""
+        df = self._project(x_column, *columns)
+        if df[x_column].is_monotonic_increasing:
+            return df
+        
+        # Plain numeric/datetime keys: argsort the one column and gather rows, no sort_values frame machinery
+        x = df[x_column].to_numpy()
+        if x.dtype.kind in 'biufmM':
+            return df.take(np.argsort(x, kind='stable'))
+        return df.sort_values(by=x_column, kind='stable')
+    
+    @staticmethod
+    def _sample_points(df: pd.DataFrame, max_points: int = None) -> pd.DataFrame:
+        """Uniform random subset for scatter plots, kept in the frame's order"""
+        max_points = max_points or MAX_PLOT_POINTS
+        if len(df) <= max_points:
+            return df
+        return df.sample(n=max_points, random_state=0).sort_index()
+    
+    @staticmethod
+    def _stride_points(df: pd.DataFrame, max_points: int = None) -> pd.DataFrame:
+        """Every k-th row of an ordered frame so a line keeps its shape"""
+        max_points = max_points or MAX_PLOT_POINTS
+        if len(df) <= max_points:
+            return df
+        return df.iloc[::-(-len(df) // max_points)]
+    
     def get_available_visualizations(self) -> List[Dict[str, Any]]:
-        visualizations = [
-            {
-                'type': 'histogram',
-                'name': 'Histogram',
-                'description': 'Distribution of a numeric variable',
-                'required_columns': 1,
-                'column_types': ['numeric']
-            },
-            {
-                'type': 'scatter',
-                'name': 'Scatter Plot',
-                'description': 'Relationship between two numeric variables',
-                'required_columns': 2,
-                'column_types': ['numeric', 'numeric']
-            },
-            {
-                'type': 'line',
-                'name': 'Line Plot',
-                'description': 'Trend over time or ordered categories',
-                'required_columns': 2,
-                'column_types': ['any', 'numeric']
-            },
-            {
-                'type': 'bar',
-                'name': 'Bar Chart',
-                'description': 'Comparison across categories',
-                'required_columns': 2,
-                'column_types': ['any', 'numeric']
-            },
-            {
-                'type': 'box',
-                'name': 'Box Plot',
-                'description': 'Distribution comparison across categories',
-                'required_columns': 2,
-                'column_types': ['any', 'numeric']
-            },
-            {
-                'type': 'heatmap',
-                'name': 'Heatmap',
-                'description': 'Matrix visualization of relationships',
-                'required_columns': 2,
-                'column_types': ['any', 'any']
-            },
-            {
-                'type': 'correlation',
-                'name': 'Correlation Matrix',
-                'description': 'Correlations between all numeric variables',
-                'required_columns': 2,
-                'column_types': ['numeric']
-            },
-            {
-                'type': 'pie',
-                'name': 'Pie Chart',
-                'description': 'Proportional composition',
-                'required_columns': 2,
-                'column_types': ['any', 'numeric']
-            }
-        ]
-        
-        return visualizations
+        return list(AVAILABLE_VISUALIZATIONS)